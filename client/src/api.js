@@ -73,8 +73,9 @@ export const uploadInstructorPhoto = (id, file) => {
   return api.post(`/instructors/${id}/photo`, formData);
 };
 
-export const getInstructorPhoto = async (id) => {
+export const getInstructorPhoto = async (id, size = "original") => {
   const response = await api.get(`/instructors/${id}/photo`, {
+    params: { size },
     responseType: "blob",
   });
   return response.data;
@@ -112,8 +113,9 @@ export const uploadStudentPhoto = (student_id, file) => {
   return api.post(`/students/${student_id}/photo`, formData);
 };
 
-export const getStudentPhoto = async (id) => {
+export const getStudentPhoto = async (id, size = "original") => {
   const response = await api.get(`/students/${id}/photo`, {
+    params: { size },
     responseType: "blob",
   });
   return response.data;
@@ -11,11 +11,20 @@ export function connectWebSocket() {
   };
 
   socket.onmessage = (event) => {
-    console.log("Сообщение:", event.data);
-    if (event.data === "balance_done") {
-      // уведомляем всех подписчиков
-      listeners.forEach((cb) => cb());
+    if (event.data === "ping") {
+      // heartbeat сервера: без ответа соединение считается мёртвым
+      socket.send("pong");
+      return;
     }
+    let message;
+    try {
+      message = JSON.parse(event.data);
+    } catch {
+      console.warn("Непонятное сообщение:", event.data);
+      return;
+    }
+    // уведомляем всех подписчиков: { type: "balance" | "created" | "updated" | "deleted", ... }
+    listeners.forEach((cb) => cb(message));
   };
 
   socket.onclose = () => {
@@ -26,7 +35,7 @@ export function connectWebSocket() {
   };
 }
 
-export function onBalanceDone(callback) {
+export function onServerEvent(callback) {
   listeners.add(callback);
   // Возвращаем функцию для отписки
   return () => listeners.delete(callback);
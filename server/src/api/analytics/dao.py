@@ -0,0 +1,168 @@
+"""Файл data access object аналитики оценок: пересчёт агрегатов кафедры и быстрые выборки из них"""
+from sqlalchemy import case, delete, extract, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from server.src.dao.basedao import BaseDAO
+from server.src.models.mark_stats import AnalyticsState, MarkStats, StudentMarkStats
+from server.src.models.student import Student
+from server.src.models.student_subject import StudentSubject
+from server.src.models.subject import Subject
+
+MARK_VALUES = range(1, 6)
+
+
+def _is_stale():
+    return AnalyticsState.changed_at.is_not(None) & (
+        AnalyticsState.refreshed_at.is_(None) | (AnalyticsState.changed_at > AnalyticsState.refreshed_at)
+    )
+
+
+class AnalyticsDAO(BaseDAO):
+    model = MarkStats
+
+    @classmethod
+    async def touch_departments(cls, session: AsyncSession, department_ids: set[int]) -> None:
+        """Отмечает, что агрегаты кафедр устарели. Вызывается в транзакции изменения"""
+        if not department_ids:
+            return
+        stmt = pg_insert(AnalyticsState).values(
+            # Порядок по id: две транзакции с одинаковыми кафедрами не заблокируют друг друга крест-накрест
+            [{"department_id": department_id, "changed_at": func.statement_timestamp()}
+             for department_id in sorted(department_ids)]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalyticsState.department_id], set_={"changed_at": stmt.excluded.changed_at}
+        )
+        await session.execute(stmt)
+
+    @classmethod
+    async def touch_students(cls, session: AsyncSession, student_ids: list[int]) -> set[int]:
+        """То же по id студентов; возвращает их кафедры"""
+        if not student_ids:
+            return set()
+        departments = (
+            select(Student.department_id, func.statement_timestamp())
+            .where(Student.id.in_(student_ids))
+            .distinct()
+            .order_by(Student.department_id)
+        )
+        stmt = pg_insert(AnalyticsState).from_select(["department_id", "changed_at"], departments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalyticsState.department_id], set_={"changed_at": stmt.excluded.changed_at}
+        ).returning(AnalyticsState.department_id)
+        result = await session.execute(stmt)
+        return set(result.scalars().all())
+
+    @classmethod
+    async def refresh_department(cls, session: AsyncSession, department_id: int) -> None:
+        """Пересчитывает агрегаты одной кафедры — объём работы зависит от размера кафедры, а не всей базы"""
+        # Время начала пересчёта: изменения, закоммиченные позже, оставят кафедру устаревшей
+        state = pg_insert(AnalyticsState).values(department_id=department_id, refreshed_at=func.clock_timestamp())
+        await session.execute(state.on_conflict_do_update(
+            index_elements=[AnalyticsState.department_id], set_={"refreshed_at": state.excluded.refreshed_at}
+        ))
+
+        marks = (
+            select(Student.department_id, Student.group_id, Student.id.label("student_id"),
+                   StudentSubject.subject_id, StudentSubject.mark)
+            .join(StudentSubject, StudentSubject.student_id == Student.id)
+            .where(Student.department_id == department_id, StudentSubject.mark.is_not(None))
+            .subquery()
+        )
+        await session.execute(delete(MarkStats).where(MarkStats.department_id == department_id))
+        await session.execute(insert(MarkStats).from_select(
+            ["department_id", "group_id", "subject_id", "marks_count", "marks_sum",
+             *(f"mark_{value}" for value in MARK_VALUES)],
+            select(
+                marks.c.department_id,
+                marks.c.group_id,
+                marks.c.subject_id,
+                func.count(),
+                func.sum(marks.c.mark),
+                *(func.count().filter(marks.c.mark == value) for value in MARK_VALUES),
+            ).group_by(marks.c.department_id, marks.c.group_id, marks.c.subject_id)
+        ))
+        await session.execute(delete(StudentMarkStats).where(StudentMarkStats.department_id == department_id))
+        await session.execute(insert(StudentMarkStats).from_select(
+            ["student_id", "department_id", "group_id", "marks_count", "average"],
+            select(
+                marks.c.student_id,
+                marks.c.department_id,
+                marks.c.group_id,
+                func.count(),
+                func.avg(marks.c.mark),
+            ).group_by(marks.c.student_id, marks.c.department_id, marks.c.group_id)
+        ))
+
+    @classmethod
+    async def find_stale_departments(cls, session: AsyncSession) -> list[int]:
+        query = select(AnalyticsState.department_id).where(_is_stale())
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    @classmethod
+    async def find_freshness(cls, session: AsyncSession, department_ids: list[int]):
+        stale = _is_stale()
+        query = select(
+            AnalyticsState.department_id,
+            AnalyticsState.changed_at,
+            AnalyticsState.refreshed_at,
+            stale.label("stale"),
+            case(
+                (stale, extract("epoch", func.clock_timestamp() - AnalyticsState.changed_at)), else_=0.0
+            ).label("lag_seconds"),
+        ).order_by(AnalyticsState.department_id)
+        if department_ids:
+            query = query.where(AnalyticsState.department_id.in_(department_ids))
+        result = await session.execute(query)
+        return result.all()
+
+    @classmethod
+    async def find_summary(cls, session: AsyncSession, group_by: list, department_ids: list[int]):
+        """Суммы счётчиков MarkStats, сгруппированные по указанным колонкам"""
+        query = select(
+            *group_by,
+            func.sum(MarkStats.marks_count).label("marks_count"),
+            func.sum(MarkStats.marks_sum).label("marks_sum"),
+            *(func.sum(getattr(MarkStats, f"mark_{value}")).label(f"mark_{value}") for value in MARK_VALUES),
+        ).group_by(*group_by).order_by(*group_by)
+        if department_ids:
+            query = query.where(MarkStats.department_id.in_(department_ids))
+        result = await session.execute(query)
+        return result.all()
+
+    @classmethod
+    async def find_subject_summary(cls, session: AsyncSession, department_ids: list[int]):
+        rows = await cls.find_summary(session, [MarkStats.subject_id], department_ids)
+        names = dict((await session.execute(
+            select(Subject.id, Subject.name).where(Subject.id.in_([row.subject_id for row in rows]))
+        )).all()) if rows else {}
+        return rows, names
+
+    @classmethod
+    async def find_top_students(
+            cls, session: AsyncSession, department_id: int | None, group_id: int | None, limit: int
+    ):
+        query = (
+            select(
+                StudentMarkStats.student_id,
+                Student.first_name,
+                Student.last_name,
+                StudentMarkStats.department_id,
+                StudentMarkStats.group_id,
+                StudentMarkStats.marks_count,
+                StudentMarkStats.average,
+            )
+            .join(Student, Student.id == StudentMarkStats.student_id)
+            # Оба ключа по убыванию — обратный проход по индексу (department_id, average, student_id)
+            .order_by(StudentMarkStats.average.desc(), StudentMarkStats.student_id.desc())
+            .limit(limit)
+        )
+        if department_id is not None:
+            query = query.where(StudentMarkStats.department_id == department_id)
+        if group_id is not None:
+            query = query.where(StudentMarkStats.group_id == group_id)
+        result = await session.execute(query)
+        return result.all()
@@ -0,0 +1,87 @@
+"""Файл содержит endpoints аналитики оценок. Ответы строятся по предагрегированным таблицам
+и сопровождаются свежестью агрегатов по затронутым кафедрам"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.api.analytics.dao import MARK_VALUES, AnalyticsDAO
+from server.src.api.analytics.schema import (
+    SDepartmentsAnalytics,
+    SGroupsAnalytics,
+    SSubjectsAnalytics,
+    STopAnalytics,
+)
+from server.src.dao.services import analytics_scheduler
+from server.src.database import get_async_session
+from server.src.models.mark_stats import MarkStats
+
+analytics_route = APIRouter(prefix="/analytics")
+
+
+def _summary(row) -> dict:
+    return {
+        "marks_count": row.marks_count,
+        "average": row.marks_sum / row.marks_count if row.marks_count else None,
+        "distribution": {value: getattr(row, f"mark_{value}") for value in MARK_VALUES},
+    }
+
+
+@analytics_route.get("/departments", summary="Средний балл и распределение оценок по кафедрам",
+                     response_model=SDepartmentsAnalytics)
+async def get_departments_analytics(
+        department_id: list[int] = Query([]),
+        session: AsyncSession = Depends(get_async_session)
+):
+    rows = await AnalyticsDAO.find_summary(session, [MarkStats.department_id], department_id)
+    return {
+        "items": [{"department_id": row.department_id, **_summary(row)} for row in rows],
+        "freshness": await AnalyticsDAO.find_freshness(session, department_id),
+    }
+
+
+@analytics_route.get("/groups", summary="Средний балл и распределение оценок по группам",
+                     response_model=SGroupsAnalytics)
+async def get_groups_analytics(
+        department_id: list[int] = Query([]),
+        session: AsyncSession = Depends(get_async_session)
+):
+    rows = await AnalyticsDAO.find_summary(session, [MarkStats.department_id, MarkStats.group_id], department_id)
+    return {
+        "items": [{"department_id": row.department_id, "group_id": row.group_id, **_summary(row)} for row in rows],
+        "freshness": await AnalyticsDAO.find_freshness(session, department_id),
+    }
+
+
+@analytics_route.get("/subjects", summary="Средний балл и распределение оценок по предметам",
+                     response_model=SSubjectsAnalytics)
+async def get_subjects_analytics(
+        department_id: list[int] = Query([]),
+        session: AsyncSession = Depends(get_async_session)
+):
+    rows, names = await AnalyticsDAO.find_subject_summary(session, department_id)
+    return {
+        "items": [
+            {"subject_id": row.subject_id, "subject_name": names.get(row.subject_id, ""), **_summary(row)}
+            for row in rows
+        ],
+        "freshness": await AnalyticsDAO.find_freshness(session, department_id),
+    }
+
+
+@analytics_route.get("/top", summary="Лучшие студенты по среднему баллу", response_model=STopAnalytics)
+async def get_top_students(
+        department_id: int | None = None,
+        group_id: int | None = None,
+        limit: int = Query(10, ge=1, le=100),
+        session: AsyncSession = Depends(get_async_session)
+):
+    rows = await AnalyticsDAO.find_top_students(session, department_id, group_id, limit)
+    return {
+        "items": rows,
+        "freshness": await AnalyticsDAO.find_freshness(session, [department_id] if department_id else []),
+    }
+
+
+@analytics_route.post("/refresh", summary="Запланировать пересчёт агрегатов кафедры")
+async def refresh_analytics(department_id: int):
+    analytics_scheduler.request(department_id)
+    return {"message": "Пересчёт запланирован"}
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SFreshness(BaseModel):
+    department_id: int
+    changed_at: datetime | None  # последнее изменение оценок или групп кафедры
+    refreshed_at: datetime | None  # начало последнего пересчёта агрегатов
+    stale: bool
+    lag_seconds: float  # сколько секунд агрегаты отстают от данных (0, если актуальны)
+
+
+class SMarkSummary(BaseModel):
+    marks_count: int
+    average: float | None
+    distribution: dict[int, int]  # {оценка: количество}
+
+
+class SDepartmentStats(SMarkSummary):
+    department_id: int
+
+
+class SGroupStats(SMarkSummary):
+    department_id: int
+    group_id: int | None
+
+
+class SSubjectStats(SMarkSummary):
+    subject_id: int
+    subject_name: str
+
+
+class STopStudent(BaseModel):
+    student_id: int
+    first_name: str
+    last_name: str
+    department_id: int
+    group_id: int | None
+    marks_count: int
+    average: float
+
+
+class SDepartmentsAnalytics(BaseModel):
+    items: list[SDepartmentStats]
+    freshness: list[SFreshness]
+
+
+class SGroupsAnalytics(BaseModel):
+    items: list[SGroupStats]
+    freshness: list[SFreshness]
+
+
+class SSubjectsAnalytics(BaseModel):
+    items: list[SSubjectStats]
+    freshness: list[SFreshness]
+
+
+class STopAnalytics(BaseModel):
+    items: list[STopStudent]
+    freshness: list[SFreshness]
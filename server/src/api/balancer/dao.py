@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from sqlalchemy import func, or_, text, update as sqlalchemy_update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from server.src.dao.basedao import BaseDAO
+from server.src.models.balance_diff import BalanceDiff
+from server.src.models.balance_job import BalanceJob
+
+
+class BalanceDiffDAO(BaseDAO):
+    model = BalanceDiff
+
+    @classmethod
+    async def find_latest(cls, session: AsyncSession, department_id: int | None, limit: int):
+        query = select(cls.model).order_by(cls.model.id.desc()).limit(limit)
+        if department_id is not None:
+            query = query.where(cls.model.department_id == department_id)
+        result = await session.execute(query)
+        return result.scalars().all()
+
+
+class BalanceJobDAO(BaseDAO):
+    model = BalanceJob
+
+    @classmethod
+    async def enqueue(cls, session: AsyncSession, department_ids, delay: float, attempts: int = 0) -> None:
+        """Ставит кафедры в очередь; если у кафедры уже есть pending-задание, запрос сливается в него"""
+        stmt = (
+            insert(cls.model)
+            .values([
+                {"department_id": department_id, "attempts": attempts,
+                 "run_after": func.now() + timedelta(seconds=delay)}
+                for department_id in sorted(department_ids)  # один порядок вставки — без взаимных блокировок
+            ])
+            # Предикат литералом: по параметру Postgres не сопоставит ON CONFLICT с частичным индексом
+            .on_conflict_do_nothing(index_elements=["department_id"], index_where=text("status = 'pending'"))
+        )
+        await session.execute(stmt)
+
+    @classmethod
+    async def claim(cls, session: AsyncSession, stale_after: float, max_attempts: int) -> BalanceJob | None:
+        """Берёт одно готовое задание, не дожидаясь заданий, которые сейчас берут другие воркеры.
+
+        running старше stale_after считается брошенным упавшим воркером и берётся повторно — если попытки
+        не исчерпаны. Иначе задание помечается failed: балансировка, которая роняет сам процесс
+        (OOM, segfault), не должна перезапускаться вечно.
+        """
+        stale = (cls.model.status == "running") & (cls.model.started_at < func.now() - timedelta(seconds=stale_after))
+        await session.execute(
+            sqlalchemy_update(cls.model)
+            .where(stale, cls.model.attempts >= max_attempts)
+            .values(status="failed", error="Воркер пропал во время балансировки, попытки исчерпаны")
+        )
+        query = (
+            select(cls.model)
+            .where(or_(
+                (cls.model.status == "pending") & (cls.model.run_after <= func.now()),
+                stale,
+            ))
+            .order_by(cls.model.run_after, cls.model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await session.execute(query)).scalar_one_or_none()
+        if job is None:
+            return None
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = func.now()
+        await session.flush()
+        return job
+
+    @classmethod
+    async def fail(cls, session: AsyncSession, job_id: int, error: str) -> None:
+        """Задание исчерпало попытки — остаётся в таблице со статусом failed"""
+        stmt = sqlalchemy_update(cls.model).where(cls.model.id == job_id).values(status="failed", error=error)
+        await session.execute(stmt)
+
+    @classmethod
+    async def count_by_status(cls, session: AsyncSession) -> dict[str, int]:
+        query = select(cls.model.status, func.count()).group_by(cls.model.status)
+        result = await session.execute(query)
+        return dict(result.all())
+
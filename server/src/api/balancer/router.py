@@ -0,0 +1,37 @@
+"""Файл содержит endpoints балансировщика: статистика очереди и история перемещений"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.api.balancer.dao import BalanceDiffDAO
+from server.src.api.balancer.schema import SBalanceDiffOut
+from server.src.dao.responses import model_response
+from server.src.dao.services import balance_queue
+from server.src.database import get_async_session
+
+balancer_route = APIRouter(prefix="/balancer")
+
+
+@balancer_route.get("/stats", summary="Статистика очереди балансировки")
+async def balancer_stats(session: AsyncSession = Depends(get_async_session)):
+    await balance_queue.refresh(session)
+    return balance_queue.stats()
+
+
+@balancer_route.get("/diffs", summary="Последние перемещения по итогам балансировок", response_model=list[SBalanceDiffOut])
+async def get_diffs(
+        department_id: int | None = None,
+        limit: int = Query(20, ge=1, le=100),
+        session: AsyncSession = Depends(get_async_session)
+):
+    return model_response(list[SBalanceDiffOut], await BalanceDiffDAO.find_latest(session, department_id, limit))
+
+
+@balancer_route.get("/diffs/{diff_id}", summary="Перемещения одной балансировки", response_model=SBalanceDiffOut)
+async def get_diff(
+        diff_id: int,
+        session: AsyncSession = Depends(get_async_session)
+):
+    diff = await BalanceDiffDAO.find_one_or_none_by_id(session, diff_id)
+    if not diff:
+        raise HTTPException(status_code=404, detail="Балансировка не найдена")
+    return model_response(SBalanceDiffOut, diff)
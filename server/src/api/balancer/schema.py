@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SMove(BaseModel):
+    """Перемещение: студент между группами или группа между преподавателями"""
+    id: int
+    from_id: int | None = Field(alias="from")
+    to_id: int = Field(alias="to")
+
+
+class SDiff(BaseModel):
+    students: list[SMove]
+    groups: list[SMove]
+    created_groups: list[int]
+    deleted_groups: list[int]
+
+
+class SBalanceDiffOut(BaseModel):
+    id: int
+    department_id: int
+    created_at: datetime
+    diff: SDiff
+
+    class Config:
+        from_attributes = True
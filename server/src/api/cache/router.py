@@ -0,0 +1,18 @@
+"""Файл содержит endpoint статистики кешей: попадания, объём, вытеснения"""
+from fastapi import APIRouter
+
+from server.src.dao.cache import detail_cache, reference_cache
+from server.src.dao.coalescing import read_coalescer
+from server.src.storage.photos import thumbnails
+
+cache_route = APIRouter(prefix="/cache")
+
+
+@cache_route.get("/stats", summary="Статистика кешей")
+def cache_stats():
+    return {
+        "reference": reference_cache.stats(),
+        "detail": detail_cache.stats(),
+        "thumbnails": thumbnails.cache.stats(),
+        "coalescing": read_coalescer.stats(),
+    }
@@ -0,0 +1,17 @@
+"""Файл содержит endpoints отладки SQL: сводка по запросам, медленные запросы и подозрения на N+1"""
+from fastapi import APIRouter, Query
+
+from server.src.dao.instrumentation import sql_instrumentation
+
+debug_route = APIRouter(prefix="/debug")
+
+
+@debug_route.get("/sql", summary="Самые затратные SQL, последние медленные запросы и подозрения на N+1")
+def sql_stats(top: int = Query(20, ge=1, le=500)):
+    return sql_instrumentation.stats(top)
+
+
+@debug_route.post("/sql/reset", summary="Сбросить накопленную статистику SQL")
+def reset_sql_stats():
+    sql_instrumentation.reset()
+    return {"message": "Статистика SQL сброшена"}
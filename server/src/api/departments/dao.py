@@ -1,6 +1,61 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
 from server.src.dao.basedao import BaseDAO
 from server.src.models.department import Department
+from server.src.models.department_stats import DepartmentStats
 
 
 class DepartmentDAO(BaseDAO):
     model = Department
+
+    @classmethod
+    async def find_existing_ids(cls, session: AsyncSession, department_ids: set[int]) -> set[int]:
+        result = await session.execute(select(cls.model.id).where(cls.model.id.in_(department_ids)))
+        return set(result.scalars().all())
+
+
+class DepartmentStatsDAO(BaseDAO):
+    model = DepartmentStats
+
+    @classmethod
+    async def find_by_department(cls, session: AsyncSession, department_id: int) -> DepartmentStats | None:
+        return await session.get(cls.model, department_id)
+
+    @classmethod
+    async def find_for_update(cls, session: AsyncSession, department_id: int) -> DepartmentStats | None:
+        """Счётчики кафедры по первичному ключу с блокировкой строки до конца транзакции.
+
+        Проверка правила и запись, которая его может нарушить, сериализуются на этой строке: триггер
+        меняет счётчик той же строки, поэтому две параллельные проверки не увидят одно и то же состояние.
+        """
+        query = select(cls.model).where(cls.model.department_id == department_id).with_for_update()
+        result = await session.execute(query)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def lock_departments(cls, session: AsyncSession, *department_ids: int) -> None:
+        """Блокирует счётчики нескольких кафедр сразу, в порядке id.
+
+        Перевод меняет счётчики обеих кафедр (триггер на UPDATE), и если заранее заблокировать только одну,
+        встречные переводы A->B и B->A берут строки в разном порядке и попадают во взаимоблокировку.
+        """
+        query = (
+            select(cls.model.department_id)
+            .where(cls.model.department_id.in_(department_ids))
+            .order_by(cls.model.department_id)
+            .with_for_update()
+        )
+        await session.execute(query)
+
+    @classmethod
+    async def find_staffed(cls, session: AsyncSession, department_ids: set[int]) -> set[int]:
+        """Кафедры из списка, на которых есть хотя бы один преподаватель"""
+        query = (
+            select(cls.model.department_id)
+            .where(cls.model.department_id.in_(department_ids), cls.model.instructors > 0)
+            .order_by(cls.model.department_id)  # один порядок блокировок — без взаимоблокировок импортов
+            .with_for_update()
+        )
+        result = await session.execute(query)
+        return set(result.scalars().all())
@@ -1,14 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.src.api.departments.dao import DepartmentDAO
+from server.src.api.departments.dao import DepartmentDAO, DepartmentStatsDAO
+from server.src.api.departments.schema import SDepartmentStats
+from server.src.dao.cache import reference_cache
 from server.src.database import get_async_session
 
 departments_route = APIRouter(prefix="/departments")
 
 
-@departments_route.get("/")
+@departments_route.get("/", summary="Список кафедр (кешируется до изменения, поддерживает If-None-Match)")
 async def get_departments(
+        request: Request,
         session: AsyncSession = Depends(get_async_session)
 ):
-    return await DepartmentDAO.find_all(session)
+    async def load():
+        return await DepartmentDAO.find_rows_json(session, "id", "name")
+
+    return await reference_cache.respond(request, "departments", load)
+
+
+@departments_route.get("/{department_id}/stats", summary="Число студентов, преподавателей и групп кафедры",
+                       response_model=SDepartmentStats)
+async def get_department_stats(
+        department_id: int,
+        session: AsyncSession = Depends(get_async_session)
+):
+    stats = await DepartmentStatsDAO.find_by_department(session, department_id)
+    if stats is not None:
+        return SDepartmentStats.model_validate(stats, from_attributes=True)
+    # Строки счётчиков нет только у кафедры, на которой ещё никого не было
+    if not await DepartmentDAO.find_one_or_none_by_id(session, department_id):
+        raise HTTPException(status_code=404, detail="Кафедра не найдена")
+    return SDepartmentStats(department_id=department_id)
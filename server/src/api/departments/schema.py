@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class SDepartmentStats(BaseModel):
+    department_id: int
+    students: int = 0
+    instructors: int = 0
+    groups: int = 0
@@ -0,0 +1,58 @@
+"""Файл содержит endpoints журнала: оценки группы и пакетное выставление оценок"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.api.analytics.dao import AnalyticsDAO
+from server.src.api.gradebook.schema import SGradebook, SMarksBatch, SMarksResult
+from server.src.api.students.dao import StudentDAO
+from server.src.dao.events import publish_marks
+from server.src.dao.responses import json_response
+from server.src.dao.services import analytics_scheduler
+from server.src.database import get_async_session
+
+gradebook_route = APIRouter(prefix="/gradebook")
+
+
+@gradebook_route.get("/groups/{group_id}", summary="Оценки студентов группы", response_model=SGradebook)
+async def get_group_gradebook(
+        group_id: int,
+        subject_id: list[int] = Query([], description="только эти предметы"),
+        session: AsyncSession = Depends(get_async_session)
+):
+    rows = await StudentDAO.find_gradebook(session, group_id, subject_id)
+    subjects, students = {}, {}
+    for row in rows:
+        subjects[row.subject_id] = row.subject_name
+        student = students.setdefault(
+            row.id, {"id": row.id, "first_name": row.first_name, "last_name": row.last_name, "marks": {}}
+        )
+        student["marks"][row.subject_id] = row.mark
+    return json_response({
+        "group_id": group_id,
+        "subjects": [{"id": subject_id, "name": name} for subject_id, name in sorted(subjects.items())],
+        "students": list(students.values()),
+    })
+
+
+@gradebook_route.put("/marks", summary="Выставить оценки пачкой (например, всей группе по предмету)",
+                     response_model=SMarksResult)
+async def update_marks(
+        batch: SMarksBatch,
+        session: AsyncSession = Depends(get_async_session)
+):
+    async with session.begin():
+        updated = await StudentDAO.update_marks_bulk(
+            session, [(item.student_id, item.subject_id, item.mark) for item in batch.marks]
+        )
+        student_ids = sorted({student_id for student_id, _ in updated})
+        departments = await AnalyticsDAO.touch_students(session, student_ids)
+    if updated:
+        await publish_marks(student_ids)
+    for department_id in departments:
+        analytics_scheduler.request(department_id)
+    missing = [
+        {"student_id": item.student_id, "subject_id": item.subject_id}
+        for item in batch.marks
+        if (item.student_id, item.subject_id) not in updated
+    ]
+    return {"updated": len(updated), "missing": missing}
@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field, field_validator
+
+from server.src.api.students.schema import validate_mark
+
+MAX_MARKS_IN_BATCH = 5000
+
+
+class SMarkIn(BaseModel):
+    student_id: int
+    subject_id: int
+    mark: int | None  # None — снять оценку
+
+    @field_validator("mark")
+    def validate_mark(cls, value: int | None, info) -> int | None:
+        return validate_mark(info.data.get("subject_id"), value)
+
+
+class SMarksBatch(BaseModel):
+    marks: list[SMarkIn] = Field(min_length=1, max_length=MAX_MARKS_IN_BATCH)
+
+    @field_validator("marks")
+    def validate_unique(cls, value: list[SMarkIn]) -> list[SMarkIn]:
+        pairs = [(item.student_id, item.subject_id) for item in value]
+        if len(set(pairs)) != len(pairs):
+            raise ValueError("Оценка для одной пары студент/предмет указана несколько раз")
+        return value
+
+
+class SMarkKey(BaseModel):
+    student_id: int
+    subject_id: int
+
+
+class SMarksResult(BaseModel):
+    updated: int
+    missing: list[SMarkKey]  # у студента нет такого предмета или студента не существует
+
+
+class SSubjectOut(BaseModel):
+    id: int
+    name: str
+
+
+class SGradebookRow(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    marks: dict[int, int | None]  # {subject_id: mark}
+
+
+class SGradebook(BaseModel):
+    group_id: int
+    subjects: list[SSubjectOut]
+    students: list[SGradebookRow]
@@ -1,7 +1,51 @@
-from server.src.dao.basedao import BaseDAO
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from server.src.dao.basedao import BaseDAO, fetch_json, json_array, json_object
+from server.src.models.department import Department
 from server.src.models.group import Group
+from server.src.models.instructor import Instructor
+from server.src.models.student import Student
+from server.src.models.student_subject import StudentSubject
 
 
 class GroupDAO(BaseDAO):
     model = Group
 
+    @classmethod
+    async def find_detail_json(cls, session: AsyncSession, group_id: int) -> bytes | None:
+        """Группа с кафедрой, преподавателем, студентами и счётчиками — один запрос, JSON собирается в Postgres"""
+        instructor = (
+            select(json_object(id=Instructor.id, first_name=Instructor.first_name, last_name=Instructor.last_name))
+            .where(Instructor.id == cls.model.instructor_id)
+            .scalar_subquery()
+        )
+        students = (
+            select(json_array(
+                json_object(id=Student.id, first_name=Student.first_name, last_name=Student.last_name),
+                Student.last_name, Student.id,
+            ))
+            .where(Student.group_id == cls.model.id)
+            .scalar_subquery()
+        )
+        students_count = select(func.count()).where(Student.group_id == cls.model.id).scalar_subquery()
+        marks_count = (
+            select(func.count(StudentSubject.mark))
+            .select_from(StudentSubject)
+            .join(Student, Student.id == StudentSubject.student_id)
+            .where(Student.group_id == cls.model.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(json_object(
+                id=cls.model.id,
+                department=json_object(id=Department.id, name=Department.name),
+                instructor=instructor,
+                counts=json_object(students=students_count, marks=marks_count),
+                students=students,
+            ))
+            .join(Department, Department.id == cls.model.department_id)
+            .where(cls.model.id == group_id)
+        )
+        return await fetch_json(session, query)
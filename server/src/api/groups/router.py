@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.src.api.groups.dao import GroupDAO
+from server.src.api.groups.schema import SGroupRead
+from server.src.dao.cache import reference_cache
 from server.src.database import get_async_session
 
 groups_route = APIRouter(prefix="/groups")
 
 
-@groups_route.get("/")
+@groups_route.get("/", summary="Список групп (кешируется до изменения, поддерживает If-None-Match)")
 async def get_groups(
+        request: Request,
         session: AsyncSession = Depends(get_async_session)
 ):
-    return await GroupDAO.find_all(session)
+    async def load():
+        return await GroupDAO.find_rows_json(session, "id", "instructor_id", "department_id")
+
+    return await reference_cache.respond(request, "groups", load)
+
+
+@groups_route.get("/{group_id}", summary="Группа: кафедра, преподаватель, студенты и счётчики", response_model=SGroupRead)
+async def get_group_by_id(
+        group_id: int,
+        session: AsyncSession = Depends(get_async_session)
+):
+    body = await GroupDAO.find_detail_json(session, group_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class SDepartmentRef(BaseModel):
+    id: int
+    name: str
+
+
+class SPersonRef(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+
+
+class SGroupCounts(BaseModel):
+    students: int
+    marks: int  # выставленные оценки студентов группы
+
+
+class SGroupRead(BaseModel):
+    id: int
+    department: SDepartmentRef
+    instructor: SPersonRef | None
+    counts: SGroupCounts
+    students: list[SPersonRef]
@@ -1,9 +1,14 @@
 """Файл data access object, содержит методы получения данных из бд для instructors"""
+from sqlalchemy import case, func, insert
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload, load_only
 
-from server.src.dao.basedao import BaseDAO
+from server.src.dao.basedao import BaseDAO, fetch_json, json_object
+from server.src.dao.importer import IMPORT_COLUMNS, copy_to_staging
+from server.src.dao.pagination import estimate_count, keyset_page, split_page
+from server.src.models.department import Department
 from server.src.models.group import Group
 from server.src.models.instructor import Instructor
 
@@ -12,20 +17,12 @@ class InstructorDAO(BaseDAO):
     model = Instructor
 
     @classmethod
-    async def find_all(cls, session: AsyncSession, filters: dict):
-        """{"d": "departments", "g": "groups", "fn": first_name", "ln: "last_name"}"""
-        query = select(cls.model).options(
-            load_only(cls.model.id, cls.model.first_name, cls.model.last_name, cls.model.department_id),
-            joinedload(cls.model.department),
-            joinedload(cls.model.groups),
-        )
-
+    def _apply_filters(cls, query, filters: dict):
         if filters.get("d"):
             query = query.where(cls.model.department_id.in_(filters["d"]))
 
         if filters.get("g"):
-            query = (query.join(Group, Group.instructor_id == cls.model.id)
-                     .where(Group.id.in_(filters["g"])).distinct())
+            query = query.where(cls.model.groups.any(Group.id.in_(filters["g"])))
 
         if filters.get("fn"):
             query = query.where(cls.model.first_name.ilike(f"%{filters['fn']}%"))
@@ -33,5 +30,101 @@ class InstructorDAO(BaseDAO):
         if filters.get("ln"):
             query = query.where(cls.model.last_name.ilike(f"%{filters['ln']}%"))
 
+        return query
+
+    @classmethod
+    async def find_all(cls, session: AsyncSession, filters: dict):
+        """{"d": "departments", "g": "groups", "fn": first_name", "ln: "last_name"}"""
+        query = select(cls.model).options(
+            load_only(cls.model.id, cls.model.first_name, cls.model.last_name, cls.model.department_id),
+            joinedload(cls.model.department),
+            joinedload(cls.model.groups),
+        )
+        query = cls._apply_filters(query, filters)
         result = await session.execute(query)
         return result.scalars().unique().all()
+
+    @classmethod
+    async def find_page(cls, session: AsyncSession, filters: dict, limit: int, after: str | None = None):
+        """Одна страница списка в порядке (last_name, id), начиная строго после курсора after.
+
+        Выбираются только колонки списка (без photo), имя кафедры через JOIN и id групп
+        коррелированным array_agg — результат это Row-кортежи без ORM-гидрации.
+        """
+        groups_ids = (
+            select(func.array_agg(aggregate_order_by(Group.id, Group.id)))
+            .where(Group.instructor_id == cls.model.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                cls.model.id,
+                cls.model.first_name,
+                cls.model.last_name,
+                cls.model.department_id,
+                Department.name.label("department_name"),
+                groups_ids.label("groups"),
+            )
+            .join(Department, Department.id == cls.model.department_id)
+        )
+        query = keyset_page(cls._apply_filters(query, filters), cls.model, limit, after)
+        result = await session.execute(query)
+        return split_page(result.all(), limit)
+
+    @classmethod
+    def export_query(cls, filters: dict):
+        """Запрос выгрузки в порядке id, группы — массивом id"""
+        groups_ids = (
+            select(func.array_agg(aggregate_order_by(Group.id, Group.id)))
+            .where(Group.instructor_id == cls.model.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                cls.model.id,
+                cls.model.first_name,
+                cls.model.last_name,
+                cls.model.birth_date,
+                cls.model.employ_date,
+                cls.model.department_id,
+                Department.name.label("department_name"),
+                groups_ids.label("groups"),
+            )
+            .join(Department, Department.id == cls.model.department_id)
+        )
+        return cls._apply_filters(query, filters).order_by(cls.model.id)
+
+    @classmethod
+    async def find_detail_json(cls, session: AsyncSession, instructor_id: int) -> bytes | None:
+        """Карточка инструктора (поля InstructorRead), собранная в Postgres"""
+        query = select(json_object(
+            id=cls.model.id,
+            first_name=cls.model.first_name,
+            last_name=cls.model.last_name,
+            birth_date=cls.model.birth_date,
+            employ_date=cls.model.employ_date,
+            department_id=cls.model.department_id,
+            photo_url=case((cls.model.photo_key.is_not(None), func.format("/instructors/%s/photo", cls.model.id))),
+        )).where(cls.model.id == instructor_id)
+        return await fetch_json(session, query)
+
+    @classmethod
+    async def estimate_total(cls, session: AsyncSession, filters: dict) -> int:
+        return await estimate_count(session, cls._apply_filters(select(cls.model.id), filters))
+
+    @classmethod
+    async def import_records(cls, session: AsyncSession, records: list[tuple]) -> dict[int, int]:
+        """Проверенные записи импорта: COPY во временную таблицу и один INSERT. Возвращает {department_id: добавлено}"""
+        staging = await copy_to_staging(session, "import_instructors", records)
+        inserted = (
+            insert(Instructor)
+            .from_select(
+                list(IMPORT_COLUMNS),
+                select(*(staging.c[column] for column in IMPORT_COLUMNS)).order_by(staging.c.row_num)
+            )
+            .returning(Instructor.department_id)
+            .cte("inserted")
+        )
+        query = select(inserted.c.department_id, func.count()).group_by(inserted.c.department_id)
+        result = await session.execute(query)
+        return dict(result.all())
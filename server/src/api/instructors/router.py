@@ -1,40 +1,69 @@
 """Файл содержит endpoints относящиеся к instructors"""
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.src.api.departments.dao import DepartmentDAO
 from server.src.api.instructors.dao import InstructorDAO
 from server.src.api.instructors.schema import (
     FilterInstructors,
     InstructorRead,
-    SDepartmentOut,
     SInstructor,
-    SInstructorsOut,
+    SInstructorsPage,
     SInstructorUpd,
 )
-from server.src.dao.services import balancer, is_last_available_instructor
-from server.src.database import get_async_session, get_sync_session
+from server.src.dao.cache import detail_cache
+from server.src.dao.coalescing import read_coalescer
+from server.src.dao.events import publish_entity, publish_import
+from server.src.dao.export import ExportFormat, export_response
+from server.src.dao.importer import SImportReport, read_batch
+from server.src.dao.pagination import PAGE_PARAMS
+from server.src.dao.responses import json_response
+from server.src.dao.services import balance_queue, is_last_available_instructor, lock_transfer
+from server.src.database import get_async_session
+from server.src.storage.photos import photo_response, release_photo, save_photo
+from server.src.storage.thumbnails import ORIGINAL, PhotoSize
 
 instructors_route = APIRouter(prefix="/instructors")
 
 
-@instructors_route.get("/", summary="Получить всех инструкторов по фильтру")
-async def get_instructors(
-        filter_query: Annotated[FilterInstructors, Query()],
-        session: AsyncSession = Depends(get_async_session)
-) -> list[SInstructorsOut]:
-    instructors_data = await InstructorDAO.find_all(session, filter_query.model_dump(exclude_none=True))
-    return [
-        SInstructorsOut(
-            id=instructor.id,
-            first_name=instructor.first_name,
-            last_name=instructor.last_name,
-            department=SDepartmentOut(id=instructor.department_id, name=instructor.department.name),
-            groups=[group.id for group in instructor.groups]
+@instructors_route.get("/", summary="Получить страницу инструкторов по фильтру", response_model=SInstructorsPage)
+async def get_instructors(request: Request, filter_query: Annotated[FilterInstructors, Query()]):
+    filters = filter_query.model_dump(exclude_none=True, exclude=PAGE_PARAMS)
+
+    async def load(session: AsyncSession):
+        rows, next_cursor = await InstructorDAO.find_page(
+            session, filters, filter_query.limit, filter_query.after
         )
-        for instructor in instructors_data
-    ]
+        total_estimate = await InstructorDAO.estimate_total(session, filters) if filter_query.total else None
+        # Строки уже в форме ответа — без повторной валидации в response_model
+        return json_response({
+            "items": [
+                {
+                    "id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "department": {"id": row.department_id, "name": row.department_name},
+                    "groups": row.groups or [],
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+            "total_estimate": total_estimate,
+        })
+
+    # После balance все вкладки перечитывают одну и ту же страницу — одинаковые запросы идут в БД один раз
+    return await read_coalescer.respond(request, load)
+
+
+@instructors_route.get("/export", summary="Выгрузка инструкторов по фильтру потоком в NDJSON или CSV")
+async def export_instructors(
+        filter_query: Annotated[FilterInstructors, Query()],
+        fmt: ExportFormat = Query("ndjson", alias="format"),
+):
+    filters = filter_query.model_dump(exclude_none=True, exclude=PAGE_PARAMS)
+    return export_response(InstructorDAO.export_query(filters), fmt, "instructors")
 
 
 @instructors_route.get("/{instructor_id}", summary="Получить одного инструктора по id", response_model=InstructorRead)
@@ -42,39 +71,61 @@ async def get_instructor_by_id(
         instructor_id: int,
         session: AsyncSession = Depends(get_async_session)
 ):
-    instructor = await InstructorDAO.find_one_or_none_by_id(session, instructor_id)
-    if not instructor:
+    body = await detail_cache.get(
+        "instructor", instructor_id, lambda: InstructorDAO.find_detail_json(session, instructor_id)
+    )
+    if body is None:
         raise HTTPException(status_code=404, detail="Инструктор не найден")
-
-    return InstructorRead.from_orm(instructor)
+    return Response(content=body, media_type="application/json")
 
 
 @instructors_route.post("/add")
 async def add_instructor(
         instructor: SInstructor,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session)
 ) -> dict:
     async with session.begin():
         added = await InstructorDAO.add(session, **instructor.model_dump())
-        if added:
-            await session.refresh(added)
-            background_tasks.add_task(balancer.balance, sync_session, added.department_id)
-            return {"message": "Инструктор успешно добавлен!", "id": added.id}
-        else:
+        if not added:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Ошибка при добавлении инструктора!"
             )
+        await session.refresh(added)
+        # Задание балансировки коммитится вместе с инструктором: воркер увидит его уже принятым
+        await balance_queue.enqueue(session, added.department_id)
+    # Событие — после коммита, чтобы клиенты увидели нового инструктора
+    await publish_entity("created", "instructor", added.id, added.department_id)
+    return {"message": "Инструктор успешно добавлен!", "id": added.id}
+
+
+@instructors_route.post("/import", summary="Массовый приём инструкторов из CSV или NDJSON", response_model=SImportReport)
+async def import_instructors(
+        request: Request,
+        session: AsyncSession = Depends(get_async_session)
+):
+    """Тело запроса — CSV с заголовком (Content-Type: text/csv) или NDJSON (application/x-ndjson)
+    с полями first_name, last_name, birth_date, department_id. Корректные строки добавляются,
+    по остальным возвращается отчёт с номером строки и причиной."""
+    batch = await read_batch(request, SInstructor)
+    async with session.begin():
+        if batch.records:
+            batch.reject_departments(
+                await DepartmentDAO.find_existing_ids(session, batch.department_ids),
+                "Кафедра не найдена"
+            )
+        imported = await InstructorDAO.import_records(session, batch.records) if batch.records else {}
+        # Одна балансировка на кафедру вместо балансировки на каждого добавленного
+        await balance_queue.enqueue(session, *imported)
+    if imported:
+        await publish_import("instructor", imported)
+    return batch.report(imported)
 
 
 @instructors_route.put("/{instructor_id}/update")
 async def update_instructor(
         instructor_id: int,
         upd_data: SInstructorUpd,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session)
 ):
     async with session.begin():
@@ -82,7 +133,8 @@ async def update_instructor(
         if not instructor:
             raise HTTPException(status_code=404, detail="Такого инструктора нет")
         department_id = instructor.department_id
-        if upd_data.department_id != department_id:
+        if upd_data.department_id and upd_data.department_id != department_id:
+            await lock_transfer(session, department_id, upd_data.department_id)
             if await is_last_available_instructor(session, department_id):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -90,24 +142,22 @@ async def update_instructor(
                 )
 
         updated = await InstructorDAO.update_by_id(session, instructor_id, upd_data.model_dump(exclude_none=True))
-        if updated:
-            if upd_data.department_id:
-                # Балансируем новый департамент и прошлый
-                background_tasks.add_task(balancer.balance, sync_session, department_id)
-                background_tasks.add_task(balancer.balance, sync_session, upd_data.department_id)
-            return {"message": "Данные инструктора успешно обновлены!"}
-        else:
+        if not updated:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Ошибка при обновлении данных инструктора!"
             )
+        if upd_data.department_id:
+            # Балансируем новый департамент и прошлый
+            await balance_queue.enqueue(session, department_id, upd_data.department_id)
+    moved_from = department_id if upd_data.department_id and upd_data.department_id != department_id else None
+    await publish_entity("updated", "instructor", instructor_id, upd_data.department_id or department_id, moved_from)
+    return {"message": "Данные инструктора успешно обновлены!"}
 
 
 @instructors_route.delete("/{instructor_id}/delete")
 async def delete_instructor(
         instructor_id: int,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session)
 ):
     async with session.begin():
@@ -115,6 +165,7 @@ async def delete_instructor(
         if not instructor:
             raise HTTPException(status_code=404, detail="Такого инструктора нет")
         department_id = instructor.department_id
+        photo_key = instructor.photo_key
         if await is_last_available_instructor(session, department_id):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -123,8 +174,10 @@ async def delete_instructor(
         deleted = await InstructorDAO.delete_by_id(session, instructor_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Ошибка при увольнении")
-        background_tasks.add_task(balancer.balance, sync_session, department_id)
-        return {"message": "Инструктор уволен"}
+        await balance_queue.enqueue(session, department_id)
+    await release_photo(session, photo_key)
+    await publish_entity("deleted", "instructor", instructor_id, department_id)
+    return {"message": "Инструктор уволен"}
 
 
 @instructors_route.post("/{instructor_id}/photo", summary="Загрузить фото инструктора")
@@ -133,24 +186,28 @@ async def upload_photo(
         file: UploadFile = File(...),
         session: AsyncSession = Depends(get_async_session),
 ):
-    instructor = await InstructorDAO.find_one_or_none_by_id(session, instructor_id)
+    instructor = await InstructorDAO.find_columns_by_id(session, instructor_id, "photo_key", "department_id")
     if not instructor:
         raise HTTPException(status_code=404, detail="Инструктор не найден")
 
-    contents = await file.read()
-    instructor.photo_mime = file.content_type
-    instructor.photo = contents
+    key, size, mime = await save_photo(session, file)
+    await InstructorDAO.update_by_id(session, instructor_id, {"photo_key": key, "photo_size": size, "photo_mime": mime})
     await session.commit()
+    if instructor.photo_key != key:
+        await release_photo(session, instructor.photo_key)
+    await publish_entity("updated", "instructor", instructor_id, instructor.department_id)
     return {"message": "Фото успешно загружено"}
 
 
 @instructors_route.get("/{instructor_id}/photo", summary="Получить фото инструктора")
 async def get_photo(
         instructor_id: int,
+        request: Request,
+        size: PhotoSize = Query(ORIGINAL, description="Сторона миниатюры в пикселях или original"),
         session: AsyncSession = Depends(get_async_session)
 ):
-    instructor = await InstructorDAO.find_one_or_none_by_id(session, instructor_id)
-    if not instructor or not instructor.photo:
+    photo = await InstructorDAO.find_columns_by_id(session, instructor_id, "photo_key", "photo_mime", "photo_size")
+    if not photo or not photo.photo_key:
         raise HTTPException(status_code=404, detail="Фото не найдено")
 
-    return Response(content=instructor.photo, media_type=instructor.photo_mime or "image/jpeg")
+    return await photo_response(request, photo.photo_key, photo.photo_mime, photo.photo_size, size)
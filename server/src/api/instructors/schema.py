@@ -2,6 +2,8 @@ from datetime import date
 
 from pydantic import BaseModel, Field, field_validator
 
+from server.src.dao.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+
 
 def validate_birth_date(value: date) -> date:
     """Проверка корректности даты рождения."""
@@ -19,6 +21,15 @@ class FilterInstructors(BaseModel):
     g: list[int] = Field([], description="groups")
     fn: str | None = Field(None, description="first name")
     ln: str | None = Field(None, description="last name")
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="page size")
+    after: str | None = Field(None, description="cursor of the previous page")
+    total: bool = Field(False, description="include total count estimate")
+
+    @field_validator("after")
+    def validate_after(cls, value: str | None) -> str | None:
+        if value is not None:
+            decode_cursor(value)
+        return value
 
 
 class SInstructor(BaseModel):
@@ -58,6 +69,12 @@ class SInstructorsOut(BaseModel):
     groups: list[int]
 
 
+class SInstructorsPage(BaseModel):
+    items: list[SInstructorsOut]
+    next_cursor: str | None = None  # None — последняя страница
+    total_estimate: int | None = None
+
+
 class InstructorRead(BaseModel):
     id: int
     first_name: str
@@ -79,5 +96,5 @@ class InstructorRead(BaseModel):
             birth_date=instructor.birth_date,
             employ_date=instructor.employ_date,
             department_id=instructor.department_id,
-            photo_url=f"/instructors/{instructor.id}/photo" if instructor.photo else None
+            photo_url=f"/instructors/{instructor.id}/photo" if instructor.photo_key else None
         )
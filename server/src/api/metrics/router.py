@@ -0,0 +1,57 @@
+"""Файл содержит endpoint /metrics в текстовом формате Prometheus"""
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.dao.cache import detail_cache, reference_cache
+from server.src.dao.coalescing import read_coalescer
+from server.src.dao.hub import websockets_manager
+from server.src.dao.metrics import (
+    BALANCE_JOBS,
+    CONTENT_TYPE,
+    WS_CONNECTIONS,
+    WS_EVICTED,
+    WS_PUBLISHED,
+    WS_QUEUED,
+    registry,
+    watch_cache,
+    watch_coalescer,
+    watch_pool,
+    watch_scheduler,
+)
+from server.src.dao.services import analytics_scheduler, balance_queue
+from server.src.database import async_engine, get_async_session, sync_engine
+from server.src.storage.photos import thumbnails
+
+metrics_route = APIRouter()
+
+watch_pool("async", async_engine.pool)
+watch_pool("sync", sync_engine.pool)
+watch_scheduler("balance", balance_queue)
+watch_scheduler("analytics", analytics_scheduler)
+watch_cache("reference", reference_cache)
+watch_cache("detail", detail_cache)
+watch_cache("thumbnails", thumbnails.cache)
+watch_coalescer(read_coalescer)
+
+
+@registry.collector
+def collect_websockets():
+    stats = websockets_manager.stats()
+    yield WS_CONNECTIONS, {}, stats["connections"]
+    yield WS_QUEUED, {}, stats["queued"]
+    yield WS_PUBLISHED, {}, stats["published"]
+    yield WS_EVICTED, {}, stats["evicted"]
+
+
+@registry.collector
+def collect_balance_jobs():
+    stats = balance_queue.stats()
+    for status, key in (("pending", "queue_depth"), ("running", "running"), ("failed", "dead")):
+        yield BALANCE_JOBS, {"status": status}, stats[key]
+
+
+@metrics_route.get("/metrics", summary="Метрики в формате Prometheus", include_in_schema=False)
+async def metrics(session: AsyncSession = Depends(get_async_session)):
+    # Очередь общая для всех процессов — её глубину знает только БД
+    await balance_queue.refresh(session)
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,72 @@
+"""Файл data access object для автодополнения по ФИ студентов и преподавателей"""
+from sqlalchemy import case, func, literal, or_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from server.src.models.instructor import Instructor
+from server.src.models.student import Student
+
+# pg_trgm строит триграммы по 3 символа — для более коротких запросов ищем только по префиксу
+TRGM_MIN_LENGTH = 3
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PeopleSearchDAO:
+    sources = (("student", Student), ("instructor", Instructor))
+
+    @staticmethod
+    def _source_query(kind: str, model, q: str, limit: int):
+        """Лучшие limit совпадений одной таблицы: сначала совпадения по префиксу, затем по similarity.
+
+        Префикс ищется по lower(name) LIKE 'q%' (btree text_pattern_ops), подстрока — по ILIKE '%q%' (GIN gin_trgm_ops).
+        """
+        prefix = escape_like(q.lower()) + "%"
+        is_prefix = or_(
+            func.lower(model.last_name).like(prefix, escape="\\"),
+            func.lower(model.first_name).like(prefix, escape="\\"),
+        )
+        if len(q) < TRGM_MIN_LENGTH:
+            condition = is_prefix
+            score = literal(1.0)
+        else:
+            substring = "%" + escape_like(q) + "%"
+            condition = or_(
+                model.last_name.ilike(substring, escape="\\"),
+                model.first_name.ilike(substring, escape="\\"),
+            )
+            score = func.greatest(func.similarity(model.last_name, q), func.similarity(model.first_name, q))
+
+        prefix_rank = case((is_prefix, 1), else_=0).label("prefix")
+        score = score.label("score")
+        return (
+            select(
+                literal(kind).label("kind"),
+                model.id,
+                model.first_name,
+                model.last_name,
+                model.department_id,
+                prefix_rank,
+                score,
+            )
+            .where(condition)
+            .order_by(prefix_rank.desc(), score.desc(), model.last_name, model.id)
+            .limit(limit)
+            .subquery()
+        )
+
+    @classmethod
+    async def search(cls, session: AsyncSession, q: str, limit: int):
+        """Общий рейтинг по студентам и преподавателям, top limit"""
+        q = q.strip()
+        parts = [select(cls._source_query(kind, model, q, limit)) for kind, model in cls.sources]
+        people = union_all(*parts).subquery()
+        query = (
+            select(people)
+            .order_by(people.c.prefix.desc(), people.c.score.desc(), people.c.last_name, people.c.id)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return result.all()
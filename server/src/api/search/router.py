@@ -0,0 +1,33 @@
+"""Файл содержит endpoint автодополнения по ФИ"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.api.search.dao import PeopleSearchDAO
+from server.src.api.search.schema import SPeopleOut, SPeopleQuery
+from server.src.dao.responses import json_response
+from server.src.database import get_async_session
+
+search_route = APIRouter(prefix="/search")
+
+SEARCH_TIMEOUT_MS = 200  # жёсткий бюджет на запрос автодополнения
+QUERY_CANCELED = "57014"  # SQLSTATE отмены по statement_timeout
+
+
+@search_route.get("/people", summary="Автодополнение по ФИ студентов и преподавателей", response_model=SPeopleOut)
+async def search_people(
+        search_query: Annotated[SPeopleQuery, Query()],
+        session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        async with session.begin():
+            await session.execute(text(f"SET LOCAL statement_timeout = {SEARCH_TIMEOUT_MS}"))
+            rows = await PeopleSearchDAO.search(session, search_query.q, search_query.limit)
+    except DBAPIError as exc:
+        if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED:
+            raise
+        return json_response({"items": [], "timed_out": True})
+    return json_response({"items": [row._asdict() for row in rows], "timed_out": False})
@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class SPeopleQuery(BaseModel):
+    q: str = Field(..., min_length=1, max_length=100, description="query")
+    limit: int = Field(10, ge=1, le=50, description="top N")
+
+
+class SPersonHit(BaseModel):
+    kind: Literal["student", "instructor"]
+    id: int
+    first_name: str
+    last_name: str
+    department_id: int
+    score: float
+
+
+class SPeopleOut(BaseModel):
+    items: list[SPersonHit]
+    timed_out: bool = False  # True — не уложились в бюджет времени, выдача пустая
@@ -1,9 +1,13 @@
-from sqlalchemy import update as sqlalchemy_update
+from sqlalchemy import Integer, bindparam, case, func, insert, type_coerce, update as sqlalchemy_update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
-from server.src.dao.basedao import BaseDAO
+from server.src.dao.basedao import BaseDAO, fetch_json, json_array, json_object
+from server.src.dao.importer import IMPORT_COLUMNS, copy_to_staging
+from server.src.dao.pagination import estimate_count, keyset_page, split_page
+from server.src.models.department import Department
 from server.src.models.student import Student
 from server.src.models.student_subject import StudentSubject
 from server.src.models.subject import Subject
@@ -13,12 +17,7 @@ class StudentDAO(BaseDAO):
     model = Student
 
     @classmethod
-    async def find_all(cls, session: AsyncSession, filters: dict):
-        query = select(cls.model).options(
-            joinedload(cls.model.group),
-            joinedload(cls.model.department),
-        )
-
+    def _apply_filters(cls, query, filters: dict):
         if filters.get("d"):
             query = query.where(cls.model.department_id.in_(filters["d"]))
 
@@ -31,9 +30,106 @@ class StudentDAO(BaseDAO):
         if filters.get("ln"):
             query = query.where(cls.model.last_name.ilike(f"%{filters['ln']}%"))
 
+        return query
+
+    @classmethod
+    async def find_all(cls, session: AsyncSession, filters: dict):
+        query = select(cls.model).options(
+            joinedload(cls.model.group),
+            joinedload(cls.model.department),
+        )
+        query = cls._apply_filters(query, filters)
         result = await session.execute(query)
         return result.scalars().unique().all()
 
+    @classmethod
+    async def find_page(cls, session: AsyncSession, filters: dict, limit: int, after: str | None = None):
+        """Одна страница списка в порядке (last_name, id), начиная строго после курсора after.
+
+        Выбираются только колонки списка (без photo) с именем кафедры через JOIN — результат это
+        Row-кортежи, ORM-объекты и identity map не создаются.
+        """
+        query = (
+            select(
+                cls.model.id,
+                cls.model.first_name,
+                cls.model.last_name,
+                cls.model.department_id,
+                Department.name.label("department_name"),
+                cls.model.group_id,
+            )
+            .join(Department, Department.id == cls.model.department_id)
+        )
+        query = keyset_page(cls._apply_filters(query, filters), cls.model, limit, after)
+        result = await session.execute(query)
+        return split_page(result.all(), limit)
+
+    @classmethod
+    def export_query(cls, filters: dict, with_marks: bool = False):
+        """Запрос выгрузки в порядке id; with_marks добавляет колонку marks — jsonb {subject_id: mark}"""
+        columns = [
+            cls.model.id,
+            cls.model.first_name,
+            cls.model.last_name,
+            cls.model.birth_date,
+            cls.model.enroll_date,
+            cls.model.department_id,
+            Department.name.label("department_name"),
+            cls.model.group_id,
+        ]
+        if with_marks:
+            marks = (
+                select(func.jsonb_object_agg(StudentSubject.subject_id, StudentSubject.mark))
+                .where(StudentSubject.student_id == cls.model.id)
+                .scalar_subquery()
+            )
+            columns.append(type_coerce(marks, JSONB).label("marks"))
+        query = select(*columns).join(Department, Department.id == cls.model.department_id)
+        return cls._apply_filters(query, filters).order_by(cls.model.id)
+
+    @classmethod
+    async def find_subjects(cls, session: AsyncSession, department_ids: list[int] | None = None):
+        """(id, название) предметов кафедр — столбцы оценок в выгрузке"""
+        query = select(Subject.id, Subject.name).order_by(Subject.id)
+        if department_ids:
+            query = query.where(Subject.department_id.in_(department_ids))
+        result = await session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    @classmethod
+    async def estimate_total(cls, session: AsyncSession, filters: dict) -> int:
+        return await estimate_count(session, cls._apply_filters(select(cls.model.id), filters))
+
+    @classmethod
+    async def find_detail_json(cls, session: AsyncSession, student_id: int) -> bytes | None:
+        """Карточка студента (поля StudentRead) одним запросом: JSON собирается в Postgres,
+        без произведения студент × предметы, ORM-гидрации и валидации Pydantic"""
+        subjects = (
+            select(json_array(
+                json_object(
+                    subject=json_object(id=Subject.id, name=Subject.name),
+                    mark=StudentSubject.mark,
+                ),
+                Subject.id,
+            ))
+            .select_from(StudentSubject)
+            .join(Subject, Subject.id == StudentSubject.subject_id)
+            .where(StudentSubject.student_id == cls.model.id)
+            .scalar_subquery()
+        )
+        query = select(json_object(
+            id=cls.model.id,
+            first_name=cls.model.first_name,
+            last_name=cls.model.last_name,
+            birth_date=cls.model.birth_date,
+            enroll_date=cls.model.enroll_date,
+            group_id=cls.model.group_id,
+            department_id=cls.model.department_id,
+            student_subjects=subjects,
+            photo_url=case((cls.model.photo_key.is_not(None), func.format("/students/%s/photo", cls.model.id))),
+        )).where(cls.model.id == student_id)
+        return await fetch_json(session, query)
+
     @classmethod
     async def find_one_or_none_by_id(cls, session: AsyncSession, data_id: int):
         query = (
@@ -69,16 +165,91 @@ class StudentDAO(BaseDAO):
 
         return new_student
 
+    @classmethod
+    async def import_records(cls, session: AsyncSession, records: list[tuple]) -> dict[int, int]:
+        """Проверенные записи импорта: COPY во временную таблицу, затем один INSERT студентов
+        и один INSERT их предметов (как в add, но для всей пачки). Возвращает {department_id: добавлено}"""
+        staging = await copy_to_staging(session, "import_students", records)
+        inserted = (
+            insert(Student)
+            .from_select(
+                list(IMPORT_COLUMNS),
+                select(*(staging.c[column] for column in IMPORT_COLUMNS)).order_by(staging.c.row_num)
+            )
+            .returning(Student.id, Student.department_id)
+            .cte("inserted")
+        )
+        inserted_subjects = (
+            insert(StudentSubject)
+            .from_select(
+                ["student_id", "subject_id"],
+                select(inserted.c.id, Subject.id).join(Subject, Subject.department_id == inserted.c.department_id)
+            )
+            .cte("inserted_subjects")
+        )
+        query = (
+            select(inserted.c.department_id, func.count())
+            .group_by(inserted.c.department_id)
+            .add_cte(inserted_subjects)
+        )
+        result = await session.execute(query)
+        return dict(result.all())
+
     @classmethod
     async def update_marks(cls, session: AsyncSession, student_id: int, marks: dict[int, int | None]):
-        for subject_id, mark in marks.items():
-            stmt = (
-                sqlalchemy_update(StudentSubject)
-                .where(
-                    StudentSubject.student_id == student_id,
-                    StudentSubject.subject_id == subject_id
-                )
-                .values(mark=mark)
+        await cls.update_marks_bulk(session, [(student_id, subject_id, mark) for subject_id, mark in marks.items()])
+
+    @classmethod
+    async def update_marks_bulk(
+            cls, session: AsyncSession, marks: list[tuple[int, int, int | None]]
+    ) -> set[tuple[int, int]]:
+        """Один UPDATE ... FROM unnest(...) для любого числа оценок [(student_id, subject_id, mark)].
+
+        Возвращает пары (student_id, subject_id), которые нашлись и обновились.
+        """
+        if not marks:
+            return set()
+        table = StudentSubject.__table__
+        new_marks = (
+            func.unnest(
+                bindparam("student_ids", type_=ARRAY(Integer)),
+                bindparam("subject_ids", type_=ARRAY(Integer)),
+                bindparam("marks", type_=ARRAY(Integer)),
             )
-            await session.execute(stmt)
-        await session.flush()
+            .table_valued("student_id", "subject_id", "mark")
+            .render_derived(name="v")
+        )
+        stmt = (
+            sqlalchemy_update(table)
+            .where(table.c.student_id == new_marks.c.student_id, table.c.subject_id == new_marks.c.subject_id)
+            .values(mark=new_marks.c.mark)
+            .returning(table.c.student_id, table.c.subject_id)
+        )
+        student_ids, subject_ids, values = zip(*marks)
+        result = await session.execute(
+            stmt, {"student_ids": list(student_ids), "subject_ids": list(subject_ids), "marks": list(values)}
+        )
+        return {tuple(row) for row in result.all()}
+
+    @classmethod
+    async def find_gradebook(cls, session: AsyncSession, group_id: int, subject_ids: list[int] | None = None):
+        """Оценки студентов группы: строки (id, first_name, last_name, subject_id, subject_name, mark)
+        в порядке (last_name, id, subject_id)"""
+        query = (
+            select(
+                cls.model.id,
+                cls.model.first_name,
+                cls.model.last_name,
+                StudentSubject.subject_id,
+                Subject.name.label("subject_name"),
+                StudentSubject.mark,
+            )
+            .join(StudentSubject, StudentSubject.student_id == cls.model.id)
+            .join(Subject, Subject.id == StudentSubject.subject_id)
+            .where(cls.model.group_id == group_id)
+            .order_by(cls.model.last_name, cls.model.id, StudentSubject.subject_id)
+        )
+        if subject_ids:
+            query = query.where(StudentSubject.subject_id.in_(subject_ids))
+        result = await session.execute(query)
+        return result.all()
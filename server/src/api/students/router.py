@@ -1,39 +1,77 @@
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.src.api.analytics.dao import AnalyticsDAO
 from server.src.api.students.dao import StudentDAO
 from server.src.api.students.schema import (
     FilterStudents,
-    SDepartmentOut,
     SStudent,
-    SStudentsOut,
+    SStudentsPage,
     SStudentUpd,
     StudentRead,
 )
-from server.src.dao.services import balancer, is_department_available
-from server.src.database import get_async_session, get_sync_session
+from server.src.dao.cache import detail_cache
+from server.src.dao.coalescing import read_coalescer
+from server.src.dao.events import publish_entity, publish_import
+from server.src.dao.export import ExportFormat, export_response
+from server.src.dao.importer import SImportReport, read_batch
+from server.src.dao.pagination import PAGE_PARAMS
+from server.src.dao.responses import json_response
+from server.src.dao.services import (
+    analytics_scheduler,
+    balance_queue,
+    is_department_available,
+    lock_transfer,
+    staffed_departments,
+)
+from server.src.database import get_async_session
+from server.src.storage.photos import photo_response, release_photo, save_photo
+from server.src.storage.thumbnails import ORIGINAL, PhotoSize
 
 students_route = APIRouter(prefix="/students")
 
 
-@students_route.get("/", summary="Получить список студентов отфильтрованный по параметрам")
-async def get_students(
+@students_route.get("/", summary="Получить страницу студентов отфильтрованную по параметрам", response_model=SStudentsPage)
+async def get_students(request: Request, filter_query: Annotated[FilterStudents, Query()]):
+    filters = filter_query.model_dump(exclude_none=True, exclude=PAGE_PARAMS)
+
+    async def load(session: AsyncSession):
+        rows, next_cursor = await StudentDAO.find_page(
+            session, filters, filter_query.limit, filter_query.after
+        )
+        total_estimate = await StudentDAO.estimate_total(session, filters) if filter_query.total else None
+        # Строки уже в форме ответа — без повторной валидации в response_model
+        return json_response({
+            "items": [
+                {
+                    "id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "department": {"id": row.department_id, "name": row.department_name},
+                    "group": row.group_id,
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+            "total_estimate": total_estimate,
+        })
+
+    # После balance все вкладки перечитывают одну и ту же страницу — одинаковые запросы идут в БД один раз
+    return await read_coalescer.respond(request, load)
+
+
+@students_route.get("/export", summary="Выгрузка студентов по фильтру потоком в NDJSON или CSV")
+async def export_students(
         filter_query: Annotated[FilterStudents, Query()],
+        fmt: ExportFormat = Query("ndjson", alias="format"),
+        marks: bool = Query(False, description="добавить оценки по каждому предмету"),
         session: AsyncSession = Depends(get_async_session)
 ):
-    students_data = await StudentDAO.find_all(session, filter_query.model_dump(exclude_none=True))
-    return [
-        SStudentsOut(
-            id=student.id,
-            first_name=student.first_name,
-            last_name=student.last_name,
-            department=SDepartmentOut(id=student.department_id, name=student.department.name),
-            group=student.group_id
-        )
-        for student in students_data
-    ]
+    filters = filter_query.model_dump(exclude_none=True, exclude=PAGE_PARAMS)
+    subjects = await StudentDAO.find_subjects(session, filters.get("d")) if marks else None
+    return export_response(StudentDAO.export_query(filters, marks), fmt, "students", subjects)
 
 
 @students_route.get("/{student_id}", summary="Получить одного студента по id", response_model=StudentRead)
@@ -41,17 +79,14 @@ async def get_student_by_id(
         student_id: int,
         session: AsyncSession = Depends(get_async_session)
 ):
-    student = await StudentDAO.find_one_or_none_by_id(session, student_id)
-    if not student:
+    body = await detail_cache.get("student", student_id, lambda: StudentDAO.find_detail_json(session, student_id))
+    if body is None:
         raise HTTPException(status_code=404, detail="Студент не найден")
-
-    return StudentRead.model_validate(student, from_attributes=True)
+    return Response(content=body, media_type="application/json")
 
 @students_route.post("/add", summary="Добавление студента")
 async def add_student(
         student: SStudent,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session),
 ) -> dict:
     async with session.begin():
@@ -61,23 +96,46 @@ async def add_student(
                 detail="Нельзя зачислять студента на кафедру без преподавателей"
             )
         added = await StudentDAO.add(session, **student.model_dump())
-        if added:
-            await session.refresh(added)
-            background_tasks.add_task(balancer.balance, sync_session, added.department_id)
-            return {"message": "Студент успешно добавлен!", "id": added.id}
-        else:
+        if not added:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Ошибка при добавлении студента"
             )
+        await session.refresh(added)
+        # Задание балансировки коммитится вместе со студентом: воркер увидит его уже зачисленным
+        await balance_queue.enqueue(session, added.department_id)
+    # Событие — после коммита, чтобы клиенты увидели нового студента
+    await publish_entity("created", "student", added.id, added.department_id)
+    return {"message": "Студент успешно добавлен!", "id": added.id}
+
+
+@students_route.post("/import", summary="Массовое зачисление студентов из CSV или NDJSON", response_model=SImportReport)
+async def import_students(
+        request: Request,
+        session: AsyncSession = Depends(get_async_session)
+):
+    """Тело запроса — CSV с заголовком (Content-Type: text/csv) или NDJSON (application/x-ndjson)
+    с полями first_name, last_name, birth_date, department_id. Корректные строки добавляются,
+    по остальным возвращается отчёт с номером строки и причиной."""
+    batch = await read_batch(request, SStudent)
+    async with session.begin():
+        if batch.records:
+            batch.reject_departments(
+                await staffed_departments(session, batch.department_ids),
+                "Нельзя зачислять студента на кафедру без преподавателей"
+            )
+        imported = await StudentDAO.import_records(session, batch.records) if batch.records else {}
+        # Одна балансировка на кафедру вместо балансировки на каждого добавленного
+        await balance_queue.enqueue(session, *imported)
+    if imported:
+        await publish_import("student", imported)
+    return batch.report(imported)
 
 
 @students_route.put("/{student_id}/update")
 async def update_student(
         student_id: int,
         upd_data: SStudentUpd,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session)
 ):
     async with session.begin():
@@ -85,7 +143,8 @@ async def update_student(
         if not student:
             raise HTTPException(status_code=404, detail="Такого студента нет")
         department_id = student.department_id
-        if upd_data.department_id != department_id:
+        if upd_data.department_id and upd_data.department_id != department_id:
+            await lock_transfer(session, department_id, upd_data.department_id)
             if not await is_department_available(session, upd_data.department_id):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -105,24 +164,27 @@ async def update_student(
             await StudentDAO.update_marks(session, student_id, marks)
             updated = True
 
-        if updated:
-            if upd_data.department_id:
-                # Балансируем новый департамент и прошлый
-                background_tasks.add_task(balancer.balance, sync_session, upd_data.department_id)
-                background_tasks.add_task(balancer.balance, sync_session, department_id)
-            return {"message": "Данные студента успешно обновлены!", "student": updated}
-        else:
+        if not updated:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Ошибка при обновлении данных студента!"
             )
+        # Аналитику меняют оценки и переход на другую кафедру
+        touched = {department_id, upd_data.department_id} - {None} if marks or upd_data.department_id else set()
+        await AnalyticsDAO.touch_departments(session, touched)
+        if upd_data.department_id:
+            # Балансируем новый департамент и прошлый
+            await balance_queue.enqueue(session, upd_data.department_id, department_id)
+    moved_from = department_id if upd_data.department_id and upd_data.department_id != department_id else None
+    await publish_entity("updated", "student", student_id, upd_data.department_id or department_id, moved_from)
+    for touched_department_id in touched:
+        analytics_scheduler.request(touched_department_id)
+    return {"message": "Данные студента успешно обновлены!", "student": updated}
 
 
 @students_route.delete("/{student_id}/delete")
 async def delete_student(
         student_id: int,
-        background_tasks: BackgroundTasks,
-        sync_session=Depends(get_sync_session),
         session: AsyncSession = Depends(get_async_session)
 ):
     async with session.begin():
@@ -130,11 +192,16 @@ async def delete_student(
         if not student:
             raise HTTPException(status_code=404, detail="Такого студента нет")
         department_id = student.department_id
+        photo_key = student.photo_key
         deleted = await StudentDAO.delete_by_id(session, student_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Ошибка при отчислении")
-        background_tasks.add_task(balancer.balance, sync_session, department_id)
-        return {"message": "Студент отчислен"}
+        await AnalyticsDAO.touch_departments(session, {department_id})
+        await balance_queue.enqueue(session, department_id)
+    await release_photo(session, photo_key)
+    await publish_entity("deleted", "student", student_id, department_id)
+    analytics_scheduler.request(department_id)
+    return {"message": "Студент отчислен"}
 
 
 @students_route.post("/{student_id}/photo", summary="Загрузить фото студента")
@@ -143,24 +210,28 @@ async def upload_photo(
         file: UploadFile = File(...),
         session: AsyncSession = Depends(get_async_session),
 ):
-    student = await StudentDAO.find_one_or_none_by_id(session, student_id)
+    student = await StudentDAO.find_columns_by_id(session, student_id, "photo_key", "department_id")
     if not student:
         raise HTTPException(status_code=404, detail="Студент не найден")
 
-    contents = await file.read()
-    student.photo_mime = file.content_type
-    student.photo = contents
+    key, size, mime = await save_photo(session, file)
+    await StudentDAO.update_by_id(session, student_id, {"photo_key": key, "photo_size": size, "photo_mime": mime})
     await session.commit()
+    if student.photo_key != key:
+        await release_photo(session, student.photo_key)
+    await publish_entity("updated", "student", student_id, student.department_id)
     return {"message": "Фото успешно загружено"}
 
 
 @students_route.get("/{student_id}/photo", summary="Получить фото студента")
 async def get_photo(
         student_id: int,
+        request: Request,
+        size: PhotoSize = Query(ORIGINAL, description="Сторона миниатюры в пикселях или original"),
         session: AsyncSession = Depends(get_async_session)
 ):
-    student = await StudentDAO.find_one_or_none_by_id(session, student_id)
-    if not student or not student.photo:
+    photo = await StudentDAO.find_columns_by_id(session, student_id, "photo_key", "photo_mime", "photo_size")
+    if not photo or not photo.photo_key:
         raise HTTPException(status_code=404, detail="Фото не найдено")
 
-    return Response(content=student.photo, media_type=student.photo_mime or "image/jpeg")
+    return await photo_response(request, photo.photo_key, photo.photo_mime, photo.photo_size, size)
@@ -2,6 +2,8 @@ from datetime import date
 
 from pydantic import BaseModel, Field, field_validator
 
+from server.src.dao.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+
 
 def validate_birth_date(value: date) -> date:
     """Проверка корректности даты рождения."""
@@ -14,11 +16,33 @@ def validate_birth_date(value: date) -> date:
     return value
 
 
+def validate_mark(subject_id: int, mark: int | None) -> int | None:
+    """Проверка оценки: None (оценки нет) или целое от 1 до 5."""
+    if mark is None:
+        return mark  # допускаем отсутствие оценки
+    # Проверяем, что это число
+    if not isinstance(mark, int):
+        raise ValueError(f"Оценка по предмету {subject_id} должна быть числом")
+    # Проверяем диапазон
+    if not (0 < mark <= 5):
+        raise ValueError(f"Оценка по предмету {subject_id} должна быть в диапазоне от 1 до 5 включительно")
+    return mark
+
+
 class FilterStudents(BaseModel):
     d: list[int] = Field([], description="departments")
     g: list[int] = Field([], description="groups")
     fn: str | None = Field(None, description="first name")
     ln: str | None = Field(None, description="last name")
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="page size")
+    after: str | None = Field(None, description="cursor of the previous page")
+    total: bool = Field(False, description="include total count estimate")
+
+    @field_validator("after")
+    def validate_after(cls, value: str | None) -> str | None:
+        if value is not None:
+            decode_cursor(value)
+        return value
 
 
 class SStudent(BaseModel):
@@ -45,6 +69,12 @@ class SStudentsOut(BaseModel):
     group: int | None
 
 
+class SStudentsPage(BaseModel):
+    items: list[SStudentsOut]
+    next_cursor: str | None = None  # None — последняя страница
+    total_estimate: int | None = None
+
+
 class SStudentUpd(BaseModel):
     last_name: str | None = None
     first_name: str | None = None
@@ -63,14 +93,7 @@ class SStudentUpd(BaseModel):
         if value is None:
             return value  # marks не переданы — пропускаем
         for subject_id, mark in value.items():
-            if mark is None:
-                continue  # допускаем отсутствие оценки
-            # Проверяем, что это число
-            if not isinstance(mark, int):
-                raise ValueError(f"Оценка по предмету {subject_id} должна быть числом")
-            # Проверяем диапазон
-            if not (0 < mark <= 5):
-                raise ValueError(f"Оценка по предмету {subject_id} должна быть в диапазоне от 1 до 5 включительно")
+            validate_mark(subject_id, mark)
         return value
 
 
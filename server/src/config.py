@@ -9,6 +9,22 @@ class Settings(BaseSettings):
     DB_NAME: str = "mydatabase"
     DB_USER: str = "myuser"
     DB_PASSWORD: str = "mypassword"
+    PHOTO_STORE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "photos")
+    PHOTO_MAX_BYTES: int = 10 * 1024 * 1024
+    THUMBNAIL_CACHE_BYTES: int = 64 * 1024 * 1024
+    THUMBNAIL_WORKERS: int = 2
+    DETAIL_CACHE_MAX_ENTRIES: int = 10_000
+    DETAIL_CACHE_TTL: float = 300.0
+    SQL_ECHO: bool = False  # построчный лог SQL движков — только для отладки, заметно снижает пропускную способность
+    SLOW_REQUEST_MS: float = 200.0  # суммарное время SQL запроса, после которого он считается медленным
+    SLOW_REQUEST_LOG_SAMPLE: float = 1.0  # доля медленных запросов, попадающих в лог
+    N_PLUS_ONE_THRESHOLD: int = 10  # сколько одинаковых SQL за запрос считается подозрением на N+1
+    BALANCE_WORKERS: int = 1  # воркеры очереди балансировки в процессе API; 0 — только отдельный python -m server.src.worker
+    BALANCE_WINDOW: float = 0.5  # сколько pending-задание копит повторные запросы кафедры
+    BALANCE_POLL_INTERVAL: float = 0.5
+    BALANCE_MAX_ATTEMPTS: int = 5
+    BALANCE_STALE_AFTER: float = 300.0  # running-задание старше этого считается брошенным упавшим воркером
+    COALESCE_REUSE_WINDOW: float = 0.0  # сколько секунд отдавать готовый ответ списка повторным одинаковым запросам
     model_config = SettingsConfigDict(env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env"))
 
 
@@ -27,3 +43,11 @@ def get_sync_db_url():
         f"postgresql+psycopg2://{settings.DB_USER}:{settings.DB_PASSWORD}@"
         f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
     )
+
+
+def get_asyncpg_dsn():
+    """DSN для прямого подключения asyncpg (LISTEN/NOTIFY) — без диалекта SQLAlchemy"""
+    return (
+        f"postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@"
+        f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    )
@@ -1,7 +1,42 @@
-from sqlalchemy import delete as sqlalchemy_delete, update as sqlalchemy_update
+from itertools import chain
+
+from sqlalchemy import (
+    Integer,
+    Text,
+    bindparam,
+    delete as sqlalchemy_delete,
+    func,
+    literal_column,
+    update as sqlalchemy_update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def json_object(**fields):
+    """json_build_object('ключ', значение, ...) в порядке полей.
+
+    Ключи — литералы в тексте запроса: тип параметра в аргументе "any" asyncpg вывести не может.
+    """
+    return func.json_build_object(
+        *chain.from_iterable((literal_column(f"'{key}'"), value) for key, value in fields.items())
+    )
+
+
+def json_array(item, *order_by):
+    """json_agg(item ORDER BY ...) с пустым массивом вместо NULL, когда строк нет"""
+    return func.coalesce(func.json_agg(aggregate_order_by(item, *order_by)), EMPTY_JSON_ARRAY)
+
+
+async def fetch_json(session: AsyncSession, query) -> bytes | None:
+    """Выполняет запрос из одного JSON-значения и возвращает его байты как есть — без ORM и Pydantic"""
+    result = await session.execute(select(query.scalar_subquery().cast(Text)))
+    body = result.scalar_one_or_none()
+    return body.encode() if body is not None else None
+
 
 class BaseDAO:
     model = None
@@ -18,6 +53,13 @@ class BaseDAO:
         result = await session.execute(query)
         return result.scalar_one_or_none()
 
+    @classmethod
+    async def find_columns_by_id(cls, session: AsyncSession, data_id: int, *columns):
+        """Только указанные колонки одной записи (Row или None) без загрузки сущности"""
+        query = select(*(getattr(cls.model, name) for name in columns)).where(cls.model.id == data_id)
+        result = await session.execute(query)
+        return result.one_or_none()
+
     @classmethod
     async def add(cls, session: AsyncSession, **values):
         new_instance = cls.model(**values)
@@ -47,6 +89,61 @@ class BaseDAO:
         result = await session.execute(stmt)
         return result
 
+    @classmethod
+    async def delete_by_ids(cls, session: AsyncSession, obj_ids: list[int]):
+        stmt = sqlalchemy_delete(cls.model).where(cls.model.id.in_(obj_ids))
+        result = await session.execute(stmt)
+        return result
+
+    @classmethod
+    async def find_all_in_dep(cls, session: AsyncSession, department_id: int):
+        query = select(cls.model).where(cls.model.department_id == department_id)
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    @classmethod
+    async def find_rows(cls, session: AsyncSession, *columns):
+        """Только указанные колонки всех записей в порядке id"""
+        query = select(*(getattr(cls.model, name) for name in columns)).order_by(cls.model.id)
+        result = await session.execute(query)
+        return result.all()
+
+    @classmethod
+    async def find_rows_json(cls, session: AsyncSession, *columns) -> bytes:
+        """То же, что find_rows, но JSON-массив объектов собирается в Postgres"""
+        row = json_object(**{name: getattr(cls.model, name) for name in columns})
+        return await fetch_json(session, select(json_array(row, cls.model.id)))
+
+    @classmethod
+    async def find_rows_in_dep(cls, session: AsyncSession, department_id: int, *columns):
+        """Только указанные колонки (Row-кортежи без ORM-объектов) в порядке id"""
+        query = (
+            select(*(getattr(cls.model, name) for name in columns))
+            .where(cls.model.department_id == department_id)
+            .order_by(cls.model.id)
+        )
+        result = await session.execute(query)
+        return result.all()
+
+    @classmethod
+    async def bulk_update_column(cls, session: AsyncSession, column: str, values: dict[int, int | None]) -> int:
+        """Один UPDATE ... FROM unnest(ids, values) вместо UPDATE на каждую строку. values: {id: новое значение}"""
+        if not values:
+            return 0
+        table = cls.model.__table__
+        new_values = (
+            func.unnest(bindparam("ids", type_=ARRAY(Integer)), bindparam("values", type_=ARRAY(Integer)))
+            .table_valued("id", "value")
+            .render_derived(name="v")
+        )
+        stmt = (
+            sqlalchemy_update(table)
+            .where(table.c.id == new_values.c.id)
+            .values({table.c[column]: new_values.c.value})
+        )
+        result = await session.execute(stmt, {"ids": list(values), "values": list(values.values())})
+        return result.rowcount
+
     @classmethod
     def sync_find_all_in_dep(cls, sync_session, department_id):
         query = select(cls.model).where(cls.model.department_id == department_id)
@@ -0,0 +1,146 @@
+"""Шина уведомлений между процессами через Postgres LISTEN/NOTIFY.
+
+Событие, опубликованное любым воркером, уходит в NOTIFY; каждый воркер держит отдельное asyncpg-соединение
+с LISTEN и раздаёт полученное своим WebSocket-клиентам.
+"""
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+import asyncpg
+from sqlalchemy import func, select
+
+from server.src.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "app_events"
+MAX_PAYLOAD_BYTES = 7900  # NOTIFY принимает до 8000 байт
+RESYNC_MESSAGE = json.dumps({"type": "resync"})  # события за время разрыва потеряны — клиентам пора перечитать
+
+
+class NotificationBus:
+    """publish() отправляет NOTIFY через общий пул, слушатель доставляет payload в deliver().
+
+    Если сообщение не помещается в NOTIFY, вместо него отправляется короткий fallback вида {"ref": ...},
+    а каждый воркер восстанавливает полное сообщение через resolve(). Пока LISTEN-соединения нет,
+    publish() доставляет сообщение локально, а после переподключения клиентам рассылается resync.
+    """
+
+    def __init__(
+            self,
+            dsn: str,
+            deliver: Callable[[str], None],
+            resolve: Callable[[dict], Awaitable[str | None]] | None = None,
+            reconnect_delay: float = 1.0,
+            max_reconnect_delay: float = 30.0,
+            health_interval: float = 10.0,
+    ):
+        self.dsn = dsn
+        self._deliver = deliver
+        self._resolve = resolve
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.health_interval = health_interval
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+        self._resolving: set[asyncio.Task] = set()
+        self.connected = asyncio.Event()
+        self.sent = 0
+        self.received = 0
+        self.reconnects = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def publish(self, message: str, fallback: str | None = None) -> None:
+        payload = message
+        if len(message.encode()) > MAX_PAYLOAD_BYTES:
+            if fallback is None:
+                logger.error("Событие больше лимита NOTIFY и без fallback — не отправлено другим воркерам")
+                self._deliver(message)
+                return
+            payload = fallback
+        if not self.connected.is_set():
+            self._deliver(message)
+        try:
+            async with async_engine.begin() as connection:
+                await connection.execute(select(func.pg_notify(CHANNEL, payload)))
+            self.sent += 1
+        except Exception:
+            logger.exception("Не удалось отправить NOTIFY")
+
+    async def _listen_forever(self):
+        delay = self.reconnect_delay
+        first = True
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception:
+                logger.warning("LISTEN недоступен, повтор через %.1f с", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(CHANNEL, self._on_notify)
+                self._connection = connection
+                self.connected.set()
+                delay = self.reconnect_delay
+                if not first:
+                    self.reconnects += 1
+                    self._deliver(RESYNC_MESSAGE)
+                first = False
+                await self._watch(connection, lost)
+            except Exception:
+                logger.warning("LISTEN-соединение потеряно")
+            finally:
+                self.connected.clear()
+                self._connection = None
+                if not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _watch(self, connection: asyncpg.Connection, lost: asyncio.Event):
+        """Ждёт разрыва; раз в health_interval проверяет соединение — полуоткрытый TCP сам не закроется"""
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), self.health_interval)
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(connection.fetchval("SELECT 1"), self.health_interval)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self.received += 1
+        if self._resolve and payload.startswith('{"ref"'):
+            task = asyncio.create_task(self._resolve_and_deliver(json.loads(payload)))
+            self._resolving.add(task)
+            task.add_done_callback(self._resolving.discard)
+            return
+        self._deliver(payload)
+
+    async def _resolve_and_deliver(self, reference: dict):
+        try:
+            message = await self._resolve(reference)
+        except Exception:
+            logger.exception("Не удалось восстановить событие %s", reference)
+            return
+        if message is not None:
+            self._deliver(message)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected.is_set(),
+            "sent": self.sent,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
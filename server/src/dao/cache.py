@@ -0,0 +1,180 @@
+"""Кеши ответов: справочники (кафедры, группы) с версиями и ETag, карточки студентов и инструкторов"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response, status
+
+from server.src.config import settings
+
+# Клиент может хранить ответ, но обязан сверить ETag — данные меняются после балансировки
+REFERENCE_CACHE_CONTROL = "no-cache"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class _Entry:
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        # ETag по содержимому, а не по версии: у разных воркеров свои счётчики, а данные одни
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class VersionedCache:
+    """Read-through кеш сериализованных ответов.
+
+    У каждой сущности есть номер версии; запись в кеше действительна, пока версия не изменилась.
+    Пути записи и балансировщик вызывают bump(), сам кеш никогда не устаревает по времени.
+    """
+
+    def __init__(self):
+        self._versions: defaultdict[str, int] = defaultdict(int)
+        self._entries: dict[str, _Entry] = {}
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def version(self, entity: str) -> int:
+        return self._versions[entity]
+
+    def bump(self, *entities: str):
+        for entity in entities:
+            self._versions[entity] += 1
+
+    def bump_all(self):
+        self.bump(*self._versions)
+
+    async def get(self, entity: str, load: Callable[[], Awaitable[list[dict] | bytes]]) -> tuple[_Entry, bool]:
+        """Возвращает (запись, попадание). Одновременные промахи по одной сущности ждут одну загрузку"""
+        entry = self._entries.get(entity)
+        if entry is not None and entry.version == self._versions[entity]:
+            self.hits += 1
+            return entry, True
+        async with self._locks[entity]:
+            entry = self._entries.get(entity)
+            if entry is not None and entry.version == self._versions[entity]:
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            # Версию фиксируем до запроса: если bump случится во время загрузки, запись сразу устареет
+            version = self._versions[entity]
+            body = await load()
+            if not isinstance(body, bytes):  # готовый JSON (собранный в Postgres) отдаётся как есть
+                body = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+            entry = _Entry(version, body)
+            self._entries[entity] = entry
+            return entry, False
+
+    async def respond(self, request: Request, entity: str, load: Callable[[], Awaitable[list[dict] | bytes]]) -> Response:
+        entry, hit = await self.get(entity, load)
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": REFERENCE_CACHE_CONTROL,
+            "X-Cache": "hit" if hit else "miss",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "versions": dict(self._versions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+reference_cache = VersionedCache()
+
+
+class DetailCache:
+    """LRU + TTL кеш сериализованных карточек (StudentRead / InstructorRead) по ключу (сущность, id).
+
+    Запись удаляется точно при изменении сущности (invalidate), TTL лишь страхует от пропущенного события.
+    Загрузка, начавшаяся до инвалидации, свой результат в кеш не кладёт — иначе туда попала бы старая версия.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items: OrderedDict[tuple[str, int], tuple[float, bytes]] = OrderedDict()
+        self._epoch = 0  # растёт при каждой инвалидации
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _drop(self, key: tuple[str, int]) -> bool:
+        item = self._items.pop(key, None)
+        if item is None:
+            return False
+        self.size -= len(item[1])
+        return True
+
+    async def get(self, entity: str, obj_id: int, load: Callable[[], Awaitable[bytes | None]]) -> bytes | None:
+        """Тело ответа из кеша или из load(); None — сущности нет (не кешируется)"""
+        key = (entity, obj_id)
+        item = self._items.get(key)
+        if item is not None:
+            if item[0] > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self._drop(key)
+            self.expirations += 1
+        self.misses += 1
+        epoch = self._epoch
+        body = await load()
+        if body is not None and epoch == self._epoch:
+            self._drop(key)
+            self._items[key] = (time.monotonic() + self.ttl, body)
+            self.size += len(body)
+            while len(self._items) > self.max_entries:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return body
+
+    def invalidate(self, entity: str, *obj_ids: int):
+        self._epoch += 1
+        for obj_id in obj_ids:
+            if self._drop((entity, obj_id)):
+                self.invalidations += 1
+
+    def clear(self):
+        self._epoch += 1
+        self._items.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "max_entries": self.max_entries,
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+detail_cache = DetailCache(settings.DETAIL_CACHE_MAX_ENTRIES, settings.DETAIL_CACHE_TTL)
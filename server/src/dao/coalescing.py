@@ -0,0 +1,98 @@
+"""Single-flight для идемпотентных GET: одинаковые одновременные запросы разделяют один запрос к БД.
+
+После события балансировки все открытые вкладки разом перечитывают списки, часто с одинаковыми фильтрами.
+Первый запрос с данным ключом (путь + отсортированные параметры) становится ведущим: его загрузка идёт
+в отдельной задаче с собственной сессией, остальные ждут её результат — готовые байты ответа.
+Отдельная задача нужна, чтобы обрыв соединения ведущего клиента не отменял загрузку для всех.
+Необязательное окно reuse_window отдаёт тот же результат ещё несколько секунд после загрузки; любое
+событие об изменениях (invalidate) отвязывает и готовые, и текущие загрузки от новых запросов.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.config import settings
+from server.src.database import async_session_maker
+
+Load = Callable[[AsyncSession], Awaitable[Response]]
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.expires_at: float | None = None  # задано, когда загрузка завершилась и результат можно переиспользовать
+
+
+class RequestCoalescer:
+    def __init__(self, reuse_window: float = 0.0):
+        self.reuse_window = reuse_window
+        self._flights: dict[str, _Flight] = {}
+        self.executed = 0  # загрузок выполнено
+        self.joined = 0  # запросов дождались чужой загрузки
+        self.reused = 0  # запросов получили недавний результат в окне reuse_window
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """Путь и параметры без учёта порядка: ?d=2&d=1 и ?d=1&d=2 — один и тот же запрос"""
+        return f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+
+    async def respond(self, request: Request, load: Load) -> Response:
+        """load(session) строит ответ. Ответ ведущего копируется для каждого ожидающего"""
+        key = self.key(request)
+        flight = self._flights.get(key)
+        if flight is not None and flight.expires_at is not None and flight.expires_at <= time.monotonic():
+            del self._flights[key]
+            flight = None
+        if flight is None:
+            self.executed += 1
+            flight = _Flight(asyncio.create_task(self._run(load)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._landed(key, flight))
+            state = "leader"
+        elif flight.expires_at is None:
+            self.joined += 1
+            state = "joined"
+        else:
+            self.reused += 1
+            state = "reused"
+        response = await asyncio.shield(flight.task)
+        headers = {**response.headers, "X-Coalesced": state}
+        headers.pop("content-length", None)
+        return Response(content=response.body, status_code=response.status_code, headers=headers)
+
+    @staticmethod
+    async def _run(load: Load) -> Response:
+        async with async_session_maker() as session:
+            return await load(session)
+
+    def _landed(self, key: str, flight: _Flight):
+        if self._flights.get(key) is not flight:
+            return
+        if self.reuse_window > 0 and not flight.task.cancelled() and flight.task.exception() is None:
+            flight.expires_at = time.monotonic() + self.reuse_window
+        else:
+            del self._flights[key]  # ошибки не переиспользуем: следующий запрос пробует заново
+
+    def invalidate(self):
+        """Данные изменились: новые запросы не присоединяются ни к готовым, ни к текущим загрузкам.
+
+        Текущая загрузка могла прочитать снимок до изменения — её ожидающие получат свой результат,
+        а запрос после события начнёт свежую загрузку.
+        """
+        self._flights.clear()
+
+    def stats(self) -> dict:
+        requests = self.executed + self.joined + self.reused
+        return {
+            "in_flight": sum(flight.expires_at is None for flight in self._flights.values()),
+            "executed": self.executed,
+            "joined": self.joined,
+            "reused": self.reused,
+            "folded_ratio": (self.joined + self.reused) / requests if requests else 0.0,
+        }
+
+
+read_coalescer = RequestCoalescer(settings.COALESCE_REUSE_WINDOW)
@@ -0,0 +1,143 @@
+"""Типизированные JSON-события об изменениях, которые рассылаются клиентам через /ws всех воркеров"""
+import json
+from typing import Literal
+
+from pydantic import BaseModel
+
+from server.src.api.balancer.dao import BalanceDiffDAO
+from server.src.api.balancer.schema import SMove
+from server.src.config import get_asyncpg_dsn
+from server.src.dao.bus import MAX_PAYLOAD_BYTES, NotificationBus
+from server.src.dao.cache import detail_cache, reference_cache
+from server.src.dao.coalescing import read_coalescer
+from server.src.dao.hub import websockets_manager
+from server.src.database import async_session_maker
+
+
+class BalanceEvent(BaseModel):
+    """Итог балансировки кафедры: новые группы студентов и новые преподаватели групп"""
+    type: Literal["balance"] = "balance"
+    department_id: int
+    diff_id: int
+    students: list[SMove]
+    groups: list[SMove]
+    created_groups: list[int]
+    deleted_groups: list[int]
+
+
+class EntityEvent(BaseModel):
+    """Студент или преподаватель создан, изменён или удалён"""
+    type: Literal["created", "updated", "deleted"]
+    entity: Literal["student", "instructor"]
+    id: int
+    department_id: int | None = None
+    previous_department_id: int | None = None  # при переводе — кафедра, с которой ушли
+
+
+class ImportEvent(BaseModel):
+    """Массовый импорт добавил людей на кафедры"""
+    type: Literal["imported"] = "imported"
+    entity: Literal["student", "instructor"]
+    departments: dict[int, int]  # {department_id: сколько добавлено}
+
+
+class MarksEvent(BaseModel):
+    """Изменены оценки студентов (пакетное выставление через журнал)"""
+    type: Literal["marks"] = "marks"
+    student_ids: list[int]
+
+
+async def resolve_reference(reference: dict) -> str | None:
+    """Восстанавливает событие, которое не поместилось в NOTIFY, по сохранённому diff"""
+    if reference.get("ref") != "balance":
+        return None
+    async with async_session_maker() as session:
+        balance_diff = await BalanceDiffDAO.find_one_or_none_by_id(session, reference["diff_id"])
+    if balance_diff is None:
+        return None
+    return _balance_message(balance_diff.department_id, balance_diff.id, balance_diff.diff)
+
+
+def invalidate_caches(message: str):
+    """Сбрасывает кеш справочников по событию — в том числе пришедшему от другого воркера"""
+    event = json.loads(message)
+    read_coalescer.invalidate()
+    if event["type"] == "resync":
+        # События за время разрыва потеряны
+        reference_cache.bump_all()
+        detail_cache.clear()
+    elif event["type"] == "balance":
+        _invalidate_balance(event)
+    elif event["type"] == "marks":
+        detail_cache.invalidate("student", *event["student_ids"])
+    elif event["type"] != "imported":  # импорт только добавляет — закешированных карточек у новых людей нет
+        detail_cache.invalidate(event["entity"], event["id"])
+
+
+def _invalidate_balance(diff: dict):
+    # Карточка студента содержит группу, карточка инструктора групп не содержит
+    detail_cache.invalidate("student", *(move["id"] for move in diff["students"]))
+    if diff["groups"] or diff["created_groups"] or diff["deleted_groups"]:
+        reference_cache.bump("groups")
+
+
+def deliver(message: str):
+    invalidate_caches(message)
+    websockets_manager.publish(message)
+
+
+bus = NotificationBus(get_asyncpg_dsn(), deliver, resolve_reference)
+
+
+def _balance_message(department_id: int, diff_id: int, diff: dict) -> str:
+    event = BalanceEvent(department_id=department_id, diff_id=diff_id, **diff)
+    return event.model_dump_json(by_alias=True)
+
+
+async def publish_balance(department_id: int, diff_id: int, diff: dict) -> None:
+    _invalidate_balance(diff)  # свой воркер — сразу, остальные — по NOTIFY
+    fallback = json.dumps({"ref": "balance", "diff_id": diff_id})
+    await bus.publish(_balance_message(department_id, diff_id, diff), fallback)
+
+
+async def publish_entity(
+        event_type: str,
+        entity: str,
+        entity_id: int,
+        department_id: int | None = None,
+        previous_department_id: int | None = None,
+) -> None:
+    detail_cache.invalidate(entity, entity_id)
+    event = EntityEvent(
+        type=event_type, entity=entity, id=entity_id,
+        department_id=department_id, previous_department_id=previous_department_id,
+    )
+    await bus.publish(event.model_dump_json())
+
+
+async def publish_import(entity: str, departments: dict[int, int]) -> None:
+    await bus.publish(ImportEvent(entity=entity, departments=departments).model_dump_json())
+
+
+def _marks_chunks(student_ids: list[int]) -> list[list[int]]:
+    """Делит id на части, событие каждой из которых помещается в NOTIFY"""
+    budget = MAX_PAYLOAD_BYTES - len(MarksEvent(student_ids=[]).model_dump_json())
+    chunks, chunk, size = [], [], 0
+    for student_id in student_ids:
+        cost = len(str(student_id)) + 1  # число и запятая
+        if chunk and size + cost > budget:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(student_id)
+        size += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def publish_marks(student_ids: list[int]) -> None:
+    detail_cache.invalidate("student", *student_ids)
+    # Большая пачка журнала уходит несколькими событиями: сбрасываются только карточки этих студентов,
+    # resync остаётся для настоящей потери событий
+    for chunk in _marks_chunks(student_ids):
+        await bus.publish(MarksEvent(student_ids=chunk).model_dump_json())
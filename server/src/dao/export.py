@@ -0,0 +1,80 @@
+"""Потоковая выгрузка списков в NDJSON / CSV через серверный курсор"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from server.src.database import async_session_maker
+
+EXPORT_BATCH_SIZE = 1000  # строк за один FETCH курсора и за одну отправку клиенту
+ExportFormat = Literal["ndjson", "csv"]
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ";".join(map(str, value))
+    return "" if value is None else value
+
+
+class _Formatter:
+    """Превращает Row в строку выходного файла. Оценки из jsonb {subject_id: mark} разворачиваются
+    в фиксированный набор предметов: отдельный столбец на предмет в CSV, объект {название: оценка} в NDJSON"""
+
+    def __init__(self, fmt: ExportFormat, columns: list[str], subjects: list[tuple[int, str]] | None):
+        self.fmt = fmt
+        self.columns = [column for column in columns if column != "marks"]
+        self.subjects = subjects
+
+    def header(self) -> str:
+        if self.fmt != "csv":
+            return ""
+        names = self.columns + [f"mark:{name}" for _, name in self.subjects or []]
+        return self._csv_line(names)
+
+    def line(self, row) -> str:
+        record = row._mapping
+        marks = None
+        if self.subjects is not None:
+            by_id = record["marks"] or {}
+            marks = {name: by_id.get(str(subject_id)) for subject_id, name in self.subjects}
+        if self.fmt == "csv":
+            values = [_csv_value(record[column]) for column in self.columns]
+            return self._csv_line(values + [_csv_value(mark) for mark in (marks or {}).values()])
+        data = {column: record[column] for column in self.columns}
+        if marks is not None:
+            data["marks"] = marks
+        return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+    @staticmethod
+    def _csv_line(values: list) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+
+async def _stream(query: Select, formatter: _Formatter) -> AsyncIterator[str]:
+    # Своя сессия: ответ отдаётся уже после выхода из обработчика, сессия зависимости к тому времени закрыта
+    async with async_session_maker() as session:
+        result = await session.stream(query, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        yield formatter.header()
+        async for rows in result.partitions():
+            yield "".join(formatter.line(row) for row in rows)
+
+
+def export_response(
+        query: Select, fmt: ExportFormat, filename: str, subjects: list[tuple[int, str]] | None = None
+) -> StreamingResponse:
+    """В памяти одновременно не больше EXPORT_BATCH_SIZE строк независимо от размера выгрузки.
+
+    subjects — список (id, название) предметов, если query содержит колонку marks.
+    """
+    formatter = _Formatter(fmt, [column.name for column in query.selected_columns], subjects)
+    return StreamingResponse(
+        _stream(query, formatter),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,172 @@
+"""Рассылка сообщений по WebSocket: у каждого клиента своя ограниченная очередь и своя задача-писатель"""
+import asyncio
+import logging
+from collections import deque
+
+from fastapi import WebSocket
+
+from server.src.dao.metrics import WS_BROADCAST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PING_MESSAGE = "ping"  # клиент отвечает "pong" — так хаб понимает, что соединение живое
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class _Client:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: deque[tuple[str, float]] = deque()  # (сообщение, время публикации)
+        self.ready = asyncio.Event()  # в очереди что-то есть
+        self.full_since: float | None = None  # с какого момента очередь не опускается ниже queue_size
+        self.last_seen = asyncio.get_running_loop().time()
+        self.writer: asyncio.Task | None = None
+
+
+class WebSocketHub:
+    """Fan-out без последовательного await по сокетам.
+
+    publish() только раскладывает сообщение по очередям и не ждёт сеть, поэтому один зависший браузер
+    никого не задерживает. Клиент отключается, если send_text не уложился в send_timeout или очередь
+    дольше send_timeout держится на queue_size и выше. Пачка событий больше queue_size здорового клиента
+    не отключает — он успеет её разобрать; жёсткий предел памяти на клиента — max_queue_size сообщений. Heartbeat раз в heartbeat_interval шлёт ping и отключает тех, от кого дольше
+    heartbeat_timeout ничего не приходило. publish() можно вызывать из любого потока.
+    """
+
+    def __init__(
+            self,
+            queue_size: int = 100,
+            send_timeout: float = 10.0,
+            heartbeat_interval: float = 20.0,
+            heartbeat_timeout: float = 60.0,
+            max_queue_size: int | None = None,
+    ):
+        self.queue_size = queue_size
+        self.max_queue_size = max_queue_size or queue_size * 10
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self._clients: dict[WebSocket, _Client] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._closing: set[asyncio.Task] = set()
+        self.published = 0
+        self.evicted = 0
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self._clients)
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        client = _Client(websocket)
+        client.writer = asyncio.create_task(self._write(client))
+        self._clients[websocket] = client
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._beat())
+
+    def disconnect(self, websocket: WebSocket):
+        client = self._clients.pop(websocket, None)
+        if client and client.writer:
+            client.writer.cancel()
+
+    def touch(self, websocket: WebSocket):
+        """Клиент что-то прислал — значит жив"""
+        client = self._clients.get(websocket)
+        if client:
+            client.last_seen = self._loop.time()
+
+    def publish(self, message: str) -> None:
+        """Потокобезопасная неблокирующая рассылка"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(message)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, message)
+
+    async def broadcast(self, message: str):
+        self.publish(message)
+
+    def _fan_out(self, message: str, count: bool = True):
+        if count:
+            self.published += 1
+        published_at = self._loop.time()
+        for client in list(self._clients.values()):
+            if len(client.queue) >= self.queue_size:
+                if client.full_since is None:
+                    client.full_since = published_at
+                elif (published_at - client.full_since > self.send_timeout
+                      or len(client.queue) >= self.max_queue_size):
+                    self._evict(client, "slow consumer")
+                    continue
+            client.queue.append((message, published_at))
+            client.ready.set()
+
+    async def _write(self, client: _Client):
+        while True:
+            if not client.queue:
+                client.ready.clear()
+                await client.ready.wait()
+                continue
+            message, published_at = client.queue.popleft()
+            if len(client.queue) < self.queue_size:
+                client.full_since = None
+            try:
+                await asyncio.wait_for(client.websocket.send_text(message), self.send_timeout)
+                WS_BROADCAST_SECONDS.observe(self._loop.time() - published_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._evict(client, "send failed")
+                return
+
+    async def _beat(self):
+        while self._clients:
+            await asyncio.sleep(self.heartbeat_interval)
+            deadline = self._loop.time() - self.heartbeat_timeout
+            for client in list(self._clients.values()):
+                if client.last_seen < deadline:
+                    self._evict(client, "heartbeat timeout")
+            self._fan_out(PING_MESSAGE, count=False)
+
+    def _evict(self, client: _Client, reason: str):
+        if self._clients.pop(client.websocket, None) is None:
+            return
+        self.evicted += 1
+        logger.info("WebSocket-клиент отключён: %s", reason)
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        task = asyncio.create_task(self._close(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=CLOSE_TRY_AGAIN_LATER), self.send_timeout)
+        except Exception:
+            pass
+
+    async def shutdown(self):
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        for client in list(self._clients.values()):
+            self._evict(client, "server shutdown")
+        await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._clients),
+            "published": self.published,
+            "evicted": self.evicted,
+            "queued": sum(len(client.queue) for client in self._clients.values()),
+        }
+
+
+websockets_manager = WebSocketHub()
@@ -0,0 +1,214 @@
+"""Массовый импорт людей из CSV / NDJSON: потоковый разбор, проверка строк и загрузка через COPY"""
+import codecs
+import csv
+import json
+from collections import deque
+from datetime import date
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IMPORT_COLUMNS = ("first_name", "last_name", "birth_date", "department_id")
+MAX_IMPORT_ROWS = 100_000
+MAX_REPORTED_ERRORS = 1000
+
+
+class SImportError(BaseModel):
+    row: int  # номер строки данных, начиная с 1 (заголовок CSV не считается)
+    errors: list[str]
+
+
+class SImportReport(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    departments: dict[int, int]  # {department_id: сколько добавлено}
+    errors: list[SImportError]  # не больше MAX_REPORTED_ERRORS
+
+
+def _staging_table(name: str) -> Table:
+    """Временная таблица для COPY, удаляется в конце транзакции"""
+    return Table(
+        name,
+        MetaData(),
+        Column("row_num", Integer),
+        Column("first_name", String),
+        Column("last_name", String),
+        Column("birth_date", Date),
+        Column("department_id", Integer),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+async def copy_to_staging(session: AsyncSession, name: str, records: list[tuple]) -> Table:
+    """Создаёт временную таблицу и заливает в неё записи (row_num, *IMPORT_COLUMNS) одним COPY"""
+    staging = _staging_table(name)
+    connection = await session.connection()
+    await connection.run_sync(staging.create)
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        name, records=records, columns=[column.name for column in staging.columns]
+    )
+    return staging
+
+
+async def _lines(request: Request) -> AsyncIterator[str]:
+    """Строки тела запроса по мере поступления, без чтения тела целиком"""
+    buffer = b""
+    first = True
+    async for chunk in request.stream():
+        buffer += chunk
+        if first and len(buffer) >= len(codecs.BOM_UTF8):
+            buffer, first = buffer.removeprefix(codecs.BOM_UTF8), False  # BOM от Excel
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode(line)
+    if buffer:
+        yield _decode(buffer)
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Файл должен быть в кодировке UTF-8")
+
+
+class _LineFeed:
+    """Итератор строк для одного csv.reader: строки подкладываются по мере поступления из потока"""
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _csv_rows(request: Request) -> AsyncIterator[dict | str]:
+    """Один csv.reader на всё тело: поле в кавычках может содержать перевод строки.
+
+    Запись отдаётся reader'у, только когда набраны все её физические строки — чётное число кавычек
+    (экранированная "" не меняет чётность), поэтому reader никогда не упирается в ещё не пришедшие данные.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    record, quotes = [], 0
+    async for line in _lines(request):
+        if not record and not line.strip():
+            continue
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue  # внутри поля в кавычках — запись продолжается на следующей строке
+        feed.lines.append("\n".join(record))
+        record, quotes = [], 0
+        values = next(reader)
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield f"Ожидалось полей: {len(header)}, получено: {len(values)}"
+            continue
+        yield dict(zip(header, values))
+    if record:
+        yield "Незакрытые кавычки в конце файла"
+
+
+async def _ndjson_rows(request: Request) -> AsyncIterator[dict | str]:
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield "Строка не является JSON"
+            continue
+        yield row if isinstance(row, dict) else "Строка должна быть JSON-объектом"
+
+
+def _rows(request: Request) -> AsyncIterator[dict | str]:
+    """Разобранные строки (dict) или текст ошибки разбора. Формат — по Content-Type"""
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        return _csv_rows(request)
+    if "json" in content_type:  # application/x-ndjson, application/jsonl, application/json
+        return _ndjson_rows(request)
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Ожидается text/csv или application/x-ndjson"
+    )
+
+
+def _format_errors(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(map(str, item['loc'])) or 'row'}: {item['msg']}" for item in error.errors()]
+
+
+class ImportBatch:
+    """Результат проверки: записи для COPY и ошибки по строкам"""
+
+    def __init__(self):
+        self.received = 0
+        self.records: list[tuple[int, str, str, date, int]] = []
+        self.errors: list[SImportError] = []
+        self.failed = 0
+
+    def fail(self, row: int, errors: list[str]):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(SImportError(row=row, errors=errors))
+
+    def reject_departments(self, allowed: set[int], message: str):
+        """Отбрасывает записи с кафедрами не из allowed — правило проверяется одним запросом на всю пачку"""
+        records = []
+        for record in self.records:
+            if record[-1] in allowed:
+                records.append(record)
+            else:
+                self.fail(record[0], [message])
+        self.records = records
+
+    @property
+    def department_ids(self) -> set[int]:
+        return {record[-1] for record in self.records}
+
+    def report(self, imported: dict[int, int]) -> SImportReport:
+        self.errors.sort(key=lambda error: error.row)
+        return SImportReport(
+            received=self.received,
+            imported=sum(imported.values()),
+            failed=self.failed,
+            departments=imported,
+            errors=self.errors,
+        )
+
+
+async def read_batch(request: Request, schema: type[BaseModel]) -> ImportBatch:
+    """Читает тело запроса построчно и проверяет каждую строку схемой (SStudent / SInstructor)"""
+    batch = ImportBatch()
+    async for row in _rows(request):
+        batch.received += 1
+        if batch.received > MAX_IMPORT_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"За один импорт можно загрузить не больше {MAX_IMPORT_ROWS} строк"
+            )
+        if isinstance(row, str):
+            batch.fail(batch.received, [row])
+            continue
+        try:
+            person = schema.model_validate(row)
+        except ValidationError as error:
+            batch.fail(batch.received, _format_errors(error))
+            continue
+        batch.records.append((batch.received, *(getattr(person, column) for column in IMPORT_COLUMNS)))
+    return batch
@@ -0,0 +1,211 @@
+"""Учёт SQL по запросам: число запросов, время в БД, самый медленный запрос и подозрения на N+1.
+
+Данные собираются событиями движков SQLAlchemy в объект текущего HTTP-запроса (contextvar) и отдаются
+заголовком Server-Timing, выборочным логом медленных запросов и endpoint /debug/sql.
+"""
+import logging
+import random
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from server.src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\b\d+\b|'(?:[^']|'')*'")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Текст запроса без значений: одинаковые запросы с разными параметрами (и разной длиной IN) совпадают"""
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("?, ...", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+class RequestStats:
+    """SQL одного HTTP-запроса"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.statements = 0
+        self.db_time = 0.0  # секунды
+        self.slowest: tuple[float, str] | None = None
+        self.patterns: Counter[str] = Counter()
+        self.closed = False  # фоновые задачи, созданные в запросе, наследуют contextvar — после ответа не считаем
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        if self.slowest is None or duration > self.slowest[0]:
+            self.slowest = (duration, statement)
+        self.patterns[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Запросы, выполненные не меньше threshold раз — типичный след N+1"""
+        return {pattern: count for pattern, count in self.patterns.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries"'
+
+    def summary(self, threshold: int) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "statements": self.statements,
+            "db_ms": round(self.db_time * 1000, 1),
+            "slowest_ms": round(self.slowest[0] * 1000, 1) if self.slowest else None,
+            "slowest": fingerprint(self.slowest[1]) if self.slowest else None,
+            "repeated": self.repeated(threshold),
+        }
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("sql_request_stats", default=None)
+
+
+class SQLInstrumentation:
+    """Подписывается на события движков и хранит ограниченную сводку для /debug/sql"""
+
+    def __init__(
+            self,
+            slow_request_ms: float = 200.0,
+            slow_sample_rate: float = 1.0,
+            n_plus_one_threshold: int = 10,
+            max_patterns: int = 500,
+            recent_size: int = 50,
+    ):
+        self.slow_request_ms = slow_request_ms
+        self.slow_sample_rate = slow_sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_patterns = max_patterns
+        self._patterns: dict[str, list] = {}  # отпечаток -> [сколько раз, суммарное время, максимум]
+        self._recent_slow: deque[dict] = deque(maxlen=recent_size)
+        self._recent_n_plus_one: deque[dict] = deque(maxlen=recent_size)
+        self.statements = 0
+        self.db_time = 0.0
+        self.requests = 0
+        self.slow_requests = 0
+        self.n_plus_one_requests = 0
+
+    def attach(self, engine: Engine) -> None:
+        """Для async-движка передаётся его sync_engine — события курсора срабатывают там"""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        self.statements += 1
+        self.db_time += duration
+        pattern = fingerprint(statement)
+        totals = self._patterns.get(pattern)
+        if totals is None and len(self._patterns) < self.max_patterns:
+            totals = self._patterns[pattern] = [0, 0.0, 0.0]
+        if totals is not None:
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+        stats = _current.get()
+        if stats is not None and not stats.closed:
+            stats.record(statement, duration)
+
+    def begin(self, method: str, path: str) -> RequestStats:
+        stats = RequestStats(method, path)
+        _current.set(stats)
+        return stats
+
+    def finish(self, stats: RequestStats) -> None:
+        stats.closed = True
+        self.requests += 1
+        if not stats.statements:
+            return
+        if stats.repeated(self.n_plus_one_threshold):
+            self.n_plus_one_requests += 1
+            summary = stats.summary(self.n_plus_one_threshold)
+            self._recent_n_plus_one.append(summary)
+            logger.warning("Похоже на N+1: %s %s, повторы %s", stats.method, stats.path, summary["repeated"])
+        if stats.db_time * 1000 >= self.slow_request_ms:
+            self.slow_requests += 1
+            summary = stats.summary(self.n_plus_one_threshold)
+            self._recent_slow.append(summary)
+            if random.random() < self.slow_sample_rate:
+                logger.warning(
+                    "Медленный запрос %s %s: %d SQL за %.1f мс, самый долгий %.1f мс: %s",
+                    stats.method, stats.path, stats.statements, summary["db_ms"],
+                    summary["slowest_ms"], summary["slowest"],
+                )
+
+    def stats(self, top: int = 20) -> dict:
+        patterns = sorted(self._patterns.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "db_ms": round(self.db_time * 1000, 1),
+            "slow_requests": self.slow_requests,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "top_statements": [
+                {
+                    "statement": pattern,
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 1),
+                    "max_ms": round(longest * 1000, 1),
+                }
+                for pattern, (calls, total, longest) in patterns
+            ],
+            "recent_slow": list(self._recent_slow),
+            "recent_n_plus_one": list(self._recent_n_plus_one),
+        }
+
+    def reset(self) -> None:
+        self._patterns.clear()
+        self._recent_slow.clear()
+        self._recent_n_plus_one.clear()
+        self.statements = self.requests = self.slow_requests = self.n_plus_one_requests = 0
+        self.db_time = 0.0
+
+
+class SQLTimingMiddleware:
+    """ASGI-middleware: открывает учёт на время запроса и дописывает Server-Timing в заголовки ответа.
+
+    Чистый ASGI, а не BaseHTTPMiddleware, — потоковые ответы (экспорт) не буферизуются. Для них
+    заголовок отражает SQL до начала тела, итог по всему запросу попадает в лог и /debug/sql.
+    """
+
+    def __init__(self, app, instrumentation: SQLInstrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = self.instrumentation.begin(scope["method"], scope["path"])
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.instrumentation.finish(stats)
+
+
+sql_instrumentation = SQLInstrumentation(
+    slow_request_ms=settings.SLOW_REQUEST_MS,
+    slow_sample_rate=settings.SLOW_REQUEST_LOG_SAMPLE,
+    n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+)
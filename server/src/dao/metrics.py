@@ -0,0 +1,284 @@
+"""Метрики в текстовом формате Prometheus: счётчики, gauge и гистограммы без внешних зависимостей.
+
+Запись — словарь по кортежу меток и несколько сложений, поэтому метрики можно держать включёнными под
+нагрузкой. Значения, которые и так хранятся в компонентах (очереди планировщиков, пул соединений,
+хаб WebSocket, кеши), не дублируются — их читают collectors в момент запроса /metrics.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from sqlalchemy.pool import QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = tuple[str, dict, float]  # имя (с суффиксом), метки, значение
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def set(self, value: float, **labels) -> None:
+        """Для collectors: значение читается из компонента целиком"""
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in list(self._values.items()):
+            yield self.name, self._labels(key), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Кумулятивные бакеты считаются при выдаче — при записи увеличивается только один бакет"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # [счётчики по бакетам + переполнение, сумма]
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total) in list(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[tuple[_Metric, dict, float]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[tuple[_Metric, dict, float]]]):
+        """collect() возвращает (метрика, метки, значение) — значения перезаписываются при каждом запросе"""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            for metric, labels, value in collect():
+                metric.set(value, **labels)
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# --- HTTP ---
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP-запросы в обработке")
+
+# --- Пулы соединений ---
+POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "Выдачи соединений из пула", ("engine",))
+POOL_WAIT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Ожидание соединения из пула (включая установку нового)", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_SIZE = registry.gauge("db_pool_size", "Постоянный размер пула", ("engine",))
+POOL_CHECKED_OUT = registry.gauge("db_pool_checked_out", "Соединения, выданные сейчас", ("engine",))
+POOL_OVERFLOW = registry.gauge("db_pool_overflow", "Соединения сверх размера пула (отрицательно — пул не заполнен)",
+                               ("engine",))
+
+# --- Балансировщик и фоновые планировщики ---
+BALANCE_SECONDS = registry.histogram(
+    "balancer_balance_duration_seconds", "Длительность балансировки кафедры", ("department_id",)
+)
+BALANCE_MOVED = registry.counter(
+    "balancer_moved_rows_total", "Перемещено строк балансировкой", ("department_id", "kind")
+)
+BALANCE_JOBS = registry.gauge("balance_jobs", "Задания очереди балансировки в БД", ("status",))
+SCHEDULER_QUEUE = registry.gauge("scheduler_queue_depth", "Кафедры, ожидающие фоновой задачи", ("scheduler",))
+SCHEDULER_REQUESTED = registry.counter("scheduler_requested_total", "Запросы фоновой задачи", ("scheduler",))
+SCHEDULER_RUNS = registry.counter("scheduler_runs_total", "Выполненные фоновые задачи", ("scheduler",))
+SCHEDULER_FAILED = registry.counter("scheduler_failed_total", "Упавшие фоновые задачи", ("scheduler",))
+
+# --- WebSocket ---
+WS_CONNECTIONS = registry.gauge("ws_connections", "Открытые WebSocket-соединения")
+WS_QUEUED = registry.gauge("ws_queued_messages", "Сообщения в очередях WebSocket-клиентов")
+WS_PUBLISHED = registry.counter("ws_published_total", "Разосланные события")
+WS_EVICTED = registry.counter("ws_evicted_total", "Отключённые медленные или мёртвые клиенты")
+WS_BROADCAST_SECONDS = registry.histogram(
+    "ws_broadcast_latency_seconds", "От публикации события до отправки клиенту",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+)
+
+# --- Кеши ---
+CACHE_HITS = registry.counter("cache_hits_total", "Попадания в кеш", ("cache",))
+CACHE_MISSES = registry.counter("cache_misses_total", "Промахи кеша", ("cache",))
+COALESCED = registry.counter(
+    "http_coalesced_requests_total", "GET-запросы по итогу single-flight: executed, joined, reused", ("kind",)
+)
+COALESCE_IN_FLIGHT = registry.gauge("http_coalesce_in_flight", "Загрузки, которых сейчас ждут запросы")
+
+
+def watch_scheduler(name: str, scheduler) -> None:
+    @registry.collector
+    def collect():
+        stats = scheduler.stats()
+        labels = {"scheduler": name}
+        yield SCHEDULER_QUEUE, labels, stats["queue_depth"]
+        yield SCHEDULER_REQUESTED, labels, stats["requested"]
+        yield SCHEDULER_RUNS, labels, stats["runs"]
+        yield SCHEDULER_FAILED, labels, stats["failed"]
+
+
+def watch_cache(name: str, cache) -> None:
+    @registry.collector
+    def collect():
+        stats = cache.stats()
+        yield CACHE_HITS, {"cache": name}, stats["hits"]
+        yield CACHE_MISSES, {"cache": name}, stats["misses"]
+
+
+def watch_coalescer(coalescer) -> None:
+    @registry.collector
+    def collect():
+        stats = coalescer.stats()
+        for kind in ("executed", "joined", "reused"):
+            yield COALESCED, {"kind": kind}, stats[kind]
+        yield COALESCE_IN_FLIGHT, {}, stats["in_flight"]
+
+
+def watch_pool(name: str, pool) -> None:
+    @registry.collector
+    def collect():
+        labels = {"engine": name}
+        yield POOL_SIZE, labels, pool.size()
+        yield POOL_CHECKED_OUT, labels, pool.checkedout()
+        yield POOL_OVERFLOW, labels, pool.overflow()
+
+
+class _TimedCheckout:
+    """Время ожидания соединения: _do_get — единственное место пула, где выдача может блокироваться"""
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started, engine=self.metrics_name)
+            POOL_CHECKOUTS.inc(engine=self.metrics_name)
+
+
+def timed_pool(base: type[QueuePool], name: str) -> type[QueuePool]:
+    """Класс пула для create_engine(poolclass=...), который пишет выдачи и ожидание в метрики под именем name"""
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics_name": name})
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: запросы в обработке и гистограмма длительности по шаблону маршрута.
+
+    Метка route — шаблон пути (/students/{student_id}), а не сам путь, иначе число рядов не ограничено.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
@@ -0,0 +1,60 @@
+"""Keyset-пагинация списков: курсоры (last_name, id) и дешёвая оценка количества строк"""
+import base64
+import json
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+PAGE_PARAMS = {"limit", "after", "total"}  # параметры запроса, не являющиеся фильтрами
+
+
+def encode_cursor(last_name: str, obj_id: int) -> str:
+    """Курсор — непрозрачная строка с ключом последней строки страницы"""
+    raw = json.dumps([last_name, obj_id], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        last_name, obj_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Некорректный курсор")
+    if not isinstance(last_name, str) or not isinstance(obj_id, int):
+        raise ValueError("Некорректный курсор")
+    return last_name, obj_id
+
+
+def keyset_page(query, model, limit: int, after: str | None = None):
+    """Добавляет к запросу порядок (last_name, id) и условие "строго после курсора".
+
+    Ключ уникален, поэтому вставки и удаления между запросами не дают ни дублей, ни пропусков
+    среди неизменённых строк. Выбираем limit + 1 строку, чтобы понять, есть ли следующая страница.
+    """
+    key = (model.last_name, model.id)
+    if after:
+        query = query.where(tuple_(*key) > tuple_(*decode_cursor(after)))
+    return query.order_by(*key).limit(limit + 1)
+
+
+def split_page(rows, limit: int) -> tuple[list, str | None]:
+    """Отрезает лишнюю строку и возвращает (строки страницы, курсор следующей страницы)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.last_name, last.id)
+
+
+async def estimate_count(session: AsyncSession, query) -> int:
+    """Оценка числа строк по плану запроса (EXPLAIN) — без полного COUNT(*) по таблице"""
+    connection = await session.connection()
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
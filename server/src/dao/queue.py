@@ -0,0 +1,117 @@
+"""Очередь балансировки в Postgres: задания переживают перезапуск и разбираются пулом воркеров в любом процессе.
+
+Задание ставится в той же транзакции, что и изменение кафедры, — после коммита оно гарантированно есть.
+Воркеры берут задания через FOR UPDATE SKIP LOCKED и не ждут друг друга; повторные запросы по кафедре
+сливаются в её единственное pending-задание, которое ждёт window секунд — как окно BalanceScheduler.
+Сама балансировка берёт pg_advisory_xact_lock(department_id) (Balancer.balance), поэтому разные кафедры
+балансируются параллельно, а одна и та же — никогда одновременно сама с собой, сколько бы воркеров ни было.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.api.balancer.dao import BalanceJobDAO
+from server.src.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceQueue:
+    def __init__(
+            self,
+            run: Callable[[int], Awaitable[None]],
+            window: float = 0.5,
+            poll_interval: float = 0.5,
+            max_attempts: int = 5,
+            retry_delay: float = 5.0,
+            stale_after: float = 300.0,
+    ):
+        self._run = run
+        self.window = window
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay  # пауза перед попыткой n — retry_delay * n
+        self.stale_after = stale_after
+        self._workers: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self.jobs: dict[str, int] = {}  # задания по статусам на момент последнего refresh
+        self.requested = 0  # сколько раз этот процесс попросил сбалансировать
+        self.runs = 0  # сколько балансировок выполнили воркеры этого процесса
+        self.failed = 0
+
+    async def enqueue(self, session: AsyncSession, *department_ids: int) -> None:
+        """Вызывается внутри транзакции изменения: задание появится в очереди вместе с её коммитом"""
+        if not department_ids:
+            return
+        self.requested += len(department_ids)
+        await BalanceJobDAO.enqueue(session, set(department_ids), self.window)
+
+    async def run_next(self) -> bool:
+        """Выполняет одно готовое задание. False — заданий нет"""
+        async with async_session_maker() as session:
+            async with session.begin():
+                job = await BalanceJobDAO.claim(session, self.stale_after, self.max_attempts)
+                if job is None:
+                    return False
+                job_id, department_id, attempts = job.id, job.department_id, job.attempts
+            try:
+                await self._run(department_id)
+            except Exception as error:
+                self.failed += 1
+                logger.exception("Ошибка балансировки кафедры %s (попытка %s)", department_id, attempts)
+                async with session.begin():
+                    if attempts >= self.max_attempts:
+                        await BalanceJobDAO.fail(session, job_id, repr(error))
+                    else:
+                        await BalanceJobDAO.delete_by_id(session, job_id)
+                        await BalanceJobDAO.enqueue(session, {department_id}, self.retry_delay * attempts, attempts)
+            else:
+                self.runs += 1
+                # Если процесс упадёт до удаления, задание возьмут повторно: повторная балансировка ничего не сдвинет
+                async with session.begin():
+                    await BalanceJobDAO.delete_by_id(session, job_id)
+        return True
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                busy = await self.run_next()
+            except Exception:
+                logger.exception("Очередь балансировки недоступна")
+                busy = False
+            if not busy:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+
+    def start(self, workers: int) -> None:
+        self._stopping.clear()
+        for _ in range(workers):
+            task = asyncio.create_task(self._work())
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+
+    async def stop(self) -> None:
+        """Новые задания не берутся, текущие балансировки дорабатывают; остальное ждёт в таблице"""
+        self._stopping.set()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Счётчики заданий из БД (очередь общая для всех процессов). При ошибке остаются прежние"""
+        try:
+            self.jobs = await BalanceJobDAO.count_by_status(session)
+        except Exception:
+            logger.exception("Не удалось прочитать состояние очереди балансировки")
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.jobs.get("pending", 0),
+            "running": self.jobs.get("running", 0),
+            "dead": self.jobs.get("failed", 0),
+            "workers": len(self._workers),
+            "requested": self.requested,
+            "runs": self.runs,
+            "failed": self.failed,
+        }
@@ -0,0 +1,39 @@
+"""Ответы, сериализуемые ровно один раз.
+
+Если endpoint возвращает dict при заданном response_model, FastAPI валидирует его в модель, выгружает
+модель обратно в Python-объекты и только потом кодирует в JSON. Для данных, которые endpoint сам собрал
+из строк БД в нужной форме, это лишняя работа: json_response кодирует их orjson за один проход.
+Для ORM-объектов model_response один раз валидирует их TypeAdapter'ом и сразу пишет JSON в Rust.
+response_model у таких endpoints остаётся — для схемы OpenAPI.
+"""
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Ключи-числа ({subject_id: mark}, распределение оценок) — как у стандартного кодировщика FastAPI
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def json_response(payload: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    return Response(
+        content=orjson.dumps(payload, option=ORJSON_OPTIONS),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema) -> TypeAdapter:
+    """TypeAdapter строит валидатор и сериализатор при создании — создаём один раз на тип"""
+    return TypeAdapter(schema)
+
+
+def model_response(schema, value: Any) -> Response:
+    """ORM-объекты (from_attributes) -> JSON по схеме ответа: одна валидация и одна сериализация"""
+    adapter = type_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True)
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,73 @@
+"""Планировщик балансировки: копит "грязные" кафедры и балансирует каждую не чаще раза в окно"""
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceScheduler:
+    """In-process планировщик поверх event loop сервера.
+
+    request(department_id) только помечает кафедру грязной. Первая пометка планирует запуск через window
+    секунд, все пометки до запуска сливаются в него. Пометки во время балансировки планируют ещё один запуск,
+    который стартует не раньше чем через window после начала текущего — то есть кафедра балансируется
+    не чаще раза в окно и никогда не параллельно сама с собой.
+    """
+
+    def __init__(self, run: Callable[[int], Awaitable[None]], window: float = 0.5):
+        self._run = run
+        self.window = window
+        self._pending: dict[int, asyncio.Task] = {}  # кафедра -> запланированный запуск
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._tasks: set[asyncio.Task] = set()  # сильные ссылки: event loop держит задачи только слабыми
+        self.requested = 0  # сколько раз попросили сбалансировать
+        self.runs = 0  # сколько балансировок реально выполнено
+        self.failed = 0
+
+    def request(self, department_id: int) -> None:
+        self.requested += 1
+        if department_id in self._pending:
+            return
+        task = asyncio.create_task(self._run_later(department_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._pending[department_id] = task
+
+    async def _run_later(self, department_id: int) -> None:
+        lock = self._locks.setdefault(department_id, asyncio.Lock())
+        await asyncio.sleep(self.window)
+        async with lock:
+            # Снимаем пометку до запуска: запросы во время балансировки запланируют следующий проход
+            self._pending.pop(department_id, None)
+            await self._execute(department_id)
+
+    async def _execute(self, department_id: int) -> None:
+        try:
+            await self._run(department_id)
+        except Exception:
+            self.failed += 1
+            logger.exception("Ошибка фоновой задачи %s для кафедры %s", self._run.__name__, department_id)
+        else:
+            self.runs += 1
+
+    async def flush(self) -> None:
+        """Немедленно выполняет все запланированные балансировки и дожидается текущих (при остановке сервера)"""
+        pending = list(self._pending.items())
+        self._pending.clear()
+        for _, task in pending:
+            task.cancel()
+        running = [task for task in self._tasks if not task.cancelled()]
+        await asyncio.gather(*(task for _, task in pending), *running, return_exceptions=True)
+        for department_id, _ in pending:
+            async with self._locks.setdefault(department_id, asyncio.Lock()):
+                await self._execute(department_id)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._pending),
+            "requested": self.requested,
+            "runs": self.runs,
+            "failed": self.failed,
+            "coalescing_ratio": self.requested / self.runs if self.runs else None,
+        }
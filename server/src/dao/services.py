@@ -1,48 +1,45 @@
 """Файл с балансирующей функцией и дополнительной логикой для crud"""
-import asyncio
+import heapq
+import time
+from collections import Counter
 from math import ceil
 
-from fastapi import WebSocket
+from sqlalchemy import func, select
 
+from server.src.api.analytics.dao import AnalyticsDAO
+from server.src.api.balancer.dao import BalanceDiffDAO
+from server.src.api.departments.dao import DepartmentStatsDAO
 from server.src.api.groups.dao import GroupDAO
 from server.src.api.instructors.dao import InstructorDAO
 from server.src.api.students.dao import StudentDAO
+from server.src.config import settings
+from server.src.dao.events import publish_balance
+from server.src.dao.metrics import BALANCE_MOVED, BALANCE_SECONDS
+from server.src.dao.queue import BalanceQueue
+from server.src.dao.scheduler import BalanceScheduler
+from server.src.database import async_session_maker
 
 
 async def is_department_available(session, department_id: int) -> bool:
     """Проверка правила: нельзя зачислять студента на кафедру без преподавателей"""
-    if await InstructorDAO.find_all(session, {"d": [department_id]}):
-        return True
-    return False
+    stats = await DepartmentStatsDAO.find_for_update(session, department_id)
+    return stats is not None and stats.instructors > 0
 
 
-async def is_last_available_instructor(session, department_id: int) -> bool:
-    """Проверка правила: Нельзя увольнять последнего преподавателя пока на кафедре числятся студенты"""
-    department_filter = {"d": [department_id]}
-    all_instructors = await InstructorDAO.find_all(session, department_filter)
-    all_students = await StudentDAO.find_all(session, department_filter)
-    if len(all_instructors) < 2 and all_students:
-        return True
-    return False
-
-
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+async def staffed_departments(session, department_ids: set[int]) -> set[int]:
+    """То же правило, что is_department_available, одним запросом для всех кафедр пачки импорта"""
+    return await DepartmentStatsDAO.find_staffed(session, department_ids)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+async def lock_transfer(session, from_department_id: int, to_department_id: int) -> None:
+    """Перед проверкой правил перевода: счётчики обеих кафедр блокируются одним запросом в порядке id"""
+    await DepartmentStatsDAO.lock_departments(session, from_department_id, to_department_id)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
 
-
-websockets_manager = ConnectionManager()
+async def is_last_available_instructor(session, department_id: int) -> bool:
+    """Проверка правила: Нельзя увольнять последнего преподавателя пока на кафедре числятся студенты"""
+    stats = await DepartmentStatsDAO.find_for_update(session, department_id)
+    return stats is not None and stats.instructors < 2 and stats.students > 0
 
 
 class Balancer:
@@ -58,49 +55,144 @@ class Balancer:
         mean_group_num_per_instructor = ceil(group_num / instructors_in_dep_num)
         return group_num, mean_student_num_in_group, mean_group_num_per_instructor
 
-    def balance(self, sync_session, department_id: int) -> None:
-        with sync_session.begin():
-            instructors, students, groups = self._fetch_data(sync_session, department_id)
+    async def balance(self, session, department_id: int) -> dict:
+        """Перераспределяет кафедру с минимумом перемещений, сохраняет и возвращает diff"""
+        started = time.perf_counter()
+        async with session.begin():
+            # Воркеры очереди в разных процессах: одну кафедру в каждый момент балансирует только одна транзакция
+            await session.execute(select(func.pg_advisory_xact_lock(department_id)))
+            instructors, students, groups = await self._fetch_data(session, department_id)
 
             group_num, mean_student_num_in_group, mean_group_num_per_instructor = self._get_group_distribution(
                 len(instructors), len(students))
 
-            if group_num > len(groups):
-                new_group = GroupDAO.sync_add(sync_session, department_id=department_id)
+            created_groups, deleted_groups = [], []
+            while group_num > len(groups):
+                new_group = await GroupDAO.add(session, department_id=department_id)
                 groups.append(new_group)
-
-            elif group_num < len(groups):
-                extra_group = groups.pop()
-                GroupDAO.sync_delete_by_id(sync_session, extra_group.id)
-
-            self._balance_students(students, groups, mean_student_num_in_group)
-            self._balance_instructors(instructors, groups, mean_group_num_per_instructor)
-            asyncio.run(websockets_manager.broadcast("balance_done"))
+                created_groups.append(new_group.id)
+
+            if group_num < len(groups):
+                # Удаляем самые малочисленные группы — из них придётся переводить меньше всего студентов
+                sizes = Counter(student.group_id for student in students)
+                extra_groups = sorted(groups, key=lambda group: (sizes[group.id], -group.id))[:len(groups) - group_num]
+                deleted_groups = sorted(group.id for group in extra_groups)
+                await GroupDAO.delete_by_ids(session, deleted_groups)
+                groups = [group for group in groups if group.id not in deleted_groups]
+
+            students_moves = self._balance_students(students, groups, mean_student_num_in_group)
+            groups_moves = self._balance_instructors(instructors, groups, mean_group_num_per_instructor)
+            await StudentDAO.bulk_update_column(session, "group_id", students_moves)
+            if students_moves:
+                await AnalyticsDAO.touch_departments(session, {department_id})  # оценки групп поменялись
+            await GroupDAO.bulk_update_column(session, "instructor_id", groups_moves)
+
+            diff = {
+                "students": self._moves_diff(students, "group_id", students_moves),
+                "groups": self._moves_diff(groups, "instructor_id", groups_moves),
+                "created_groups": created_groups,
+                "deleted_groups": deleted_groups,
+            }
+            diff_id = None
+            if any(diff.values()):
+                diff_id = (await BalanceDiffDAO.add(session, department_id=department_id, diff=diff)).id
+        BALANCE_SECONDS.observe(time.perf_counter() - started, department_id=department_id)
+        BALANCE_MOVED.inc(len(students_moves), department_id=department_id, kind="students")
+        BALANCE_MOVED.inc(len(groups_moves), department_id=department_id, kind="groups")
+        if diff_id is not None:
+            # Пустой diff клиентам не интересен — список у них уже актуален
+            await publish_balance(department_id, diff_id, diff)
+        if students_moves:
+            analytics_scheduler.request(department_id)
+        return diff
 
     @staticmethod
-    def _balance_students(students, groups, mean_student_num_in_group):
-        groups_ids = [group.id for group in groups]
-        curr_group_index = 0
-        for i, student in enumerate(students, 1):
-            student.group_id = groups_ids[curr_group_index]
-            if i % mean_student_num_in_group == 0:
-                curr_group_index += 1
+    def _min_moves(items, attr: str, targets: list[int], capacity: int) -> dict[int, int]:
+        """Распределение с минимумом перемещений при ограничении "не больше capacity на цель".
+
+        Элемент остаётся на месте, если его цель сохранилась и ещё не заполнена (при переполнении на месте
+        остаются элементы с меньшим id). Остальные по одному уходят в наименее загруженную цель.
+        Возвращает только перемещённые: {id элемента: новая цель}.
+        """
+        load = dict.fromkeys(targets, 0)
+        homeless = []
+        for item in items:
+            current = getattr(item, attr)
+            if current in load and load[current] < capacity:
+                load[current] += 1
+            else:
+                homeless.append(item.id)
+
+        heap = [(load[target], index, target) for index, target in enumerate(targets)]
+        heapq.heapify(heap)
+        moves = {}
+        for item_id in homeless:
+            target_load, index, target = heapq.heappop(heap)
+            moves[item_id] = target
+            heapq.heappush(heap, (target_load + 1, index, target))
+        return moves
+
+    @classmethod
+    def _balance_students(cls, students, groups, mean_student_num_in_group) -> dict[int, int]:
+        """Новое распределение студентов по группам. Возвращает только изменившиеся: {student_id: group_id}"""
+        if not groups:
+            return {}
+        return cls._min_moves(students, "group_id", [group.id for group in groups], mean_student_num_in_group)
+
+    @classmethod
+    def _balance_instructors(cls, instructors, groups, mean_group_num_per_instructor) -> dict[int, int]:
+        """Новое распределение групп по преподавателям. Возвращает только изменившиеся: {group_id: instructor_id}"""
+        if not instructors:
+            return {}
+        return cls._min_moves(
+            groups, "instructor_id", [instructor.id for instructor in instructors], mean_group_num_per_instructor
+        )
 
     @staticmethod
-    def _balance_instructors(instructors, groups, mean_group_num_per_instructor):
-        instructors_ids = [instructor.id for instructor in instructors]
-        curr_instructor_index = 0
-        for i, group in enumerate(groups, 1):
-            group.instructor_id = instructors_ids[curr_instructor_index]
-            if i % mean_group_num_per_instructor == 0:
-                curr_instructor_index += 1
+    def _moves_diff(items, attr: str, moves: dict[int, int]) -> list[dict]:
+        return [
+            {"id": item.id, "from": getattr(item, attr), "to": moves[item.id]}
+            for item in items
+            if item.id in moves
+        ]
 
     @staticmethod
-    def _fetch_data(sync_session, department_id):
-        instructors = InstructorDAO.sync_find_all_in_dep(sync_session, department_id)
-        students = StudentDAO.sync_find_all_in_dep(sync_session, department_id)
-        groups = GroupDAO.sync_find_all_in_dep(sync_session, department_id)
+    async def _fetch_data(session, department_id):
+        """Только id и текущие привязки — полные сущности (с фото) балансировщику не нужны"""
+        instructors = await InstructorDAO.find_rows_in_dep(session, department_id, "id")
+        students = await StudentDAO.find_rows_in_dep(session, department_id, "id", "group_id")
+        groups = await GroupDAO.find_rows_in_dep(session, department_id, "id", "instructor_id")
         return instructors, students, groups
 
+    async def balance_department(self, department_id: int) -> None:
+        """Балансировка в собственной сессии async-движка — точка входа для воркеров очереди"""
+        async with async_session_maker() as session:
+            await self.balance(session, department_id)
+
 
 balancer = Balancer()
+balance_queue = BalanceQueue(
+    balancer.balance_department,
+    window=settings.BALANCE_WINDOW,
+    poll_interval=settings.BALANCE_POLL_INTERVAL,
+    max_attempts=settings.BALANCE_MAX_ATTEMPTS,
+    stale_after=settings.BALANCE_STALE_AFTER,
+)
+
+
+async def refresh_analytics(department_id: int) -> None:
+    """Пересчёт агрегатов аналитики кафедры в собственной сессии — точка входа для планировщика"""
+    async with async_session_maker() as session:
+        async with session.begin():
+            await AnalyticsDAO.refresh_department(session, department_id)
+
+
+# Оценки меняются пачками (журнал группы) — пересчитываем кафедру не чаще раза в 2 секунды
+analytics_scheduler = BalanceScheduler(refresh_analytics, window=2.0)
+
+
+async def schedule_stale_analytics() -> None:
+    """При старте догоняет кафедры, изменения которых не успели пересчитать (например, до перезапуска)"""
+    async with async_session_maker() as session:
+        for department_id in await AnalyticsDAO.find_stale_departments(session):
+            analytics_scheduler.request(department_id)
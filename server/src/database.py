@@ -1,12 +1,18 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, declared_attr, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-from server.src.config import get_async_db_url, get_sync_db_url
+from server.src.config import get_async_db_url, get_sync_db_url, settings
+from server.src.dao.instrumentation import sql_instrumentation
+from server.src.dao.metrics import timed_pool
 
 # --- ASYNC ---
 DATABASE_URL_ASYNC = get_async_db_url()
-async_engine = create_async_engine(DATABASE_URL_ASYNC, echo=True)
+async_engine = create_async_engine(
+    DATABASE_URL_ASYNC, echo=settings.SQL_ECHO, poolclass=timed_pool(AsyncAdaptedQueuePool, "async")
+)
+sql_instrumentation.attach(async_engine.sync_engine)
 async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
@@ -17,7 +23,8 @@ async def get_async_session():
 
 # --- SYNC ---
 DATABASE_URL_SYNC = get_sync_db_url()
-sync_engine = create_engine(DATABASE_URL_SYNC, echo=True)
+sync_engine = create_engine(DATABASE_URL_SYNC, echo=settings.SQL_ECHO, poolclass=timed_pool(QueuePool, "sync"))
+sql_instrumentation.attach(sync_engine)
 sync_session_maker = sessionmaker(bind=sync_engine, expire_on_commit=False)
 
 
@@ -1,14 +1,51 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 
+from server.src.api.analytics.router import analytics_route
+from server.src.api.balancer.router import balancer_route
+from server.src.api.cache.router import cache_route
+from server.src.api.debug.router import debug_route
 from server.src.api.departments.router import departments_route
+from server.src.api.gradebook.router import gradebook_route
 from server.src.api.groups.router import groups_route
 from server.src.api.instructors.router import instructors_route
+from server.src.api.metrics.router import metrics_route
+from server.src.api.search.router import search_route
 from server.src.api.students.router import students_route
-from server.src.dao.services import websockets_manager
+from server.src.dao.events import bus
+from server.src.dao.hub import websockets_manager
+from server.src.dao.instrumentation import SQLTimingMiddleware, sql_instrumentation
+from server.src.dao.metrics import MetricsMiddleware
+from server.src.config import settings
+from server.src.dao.services import analytics_scheduler, balance_queue, schedule_stale_analytics
+from server.src.storage.photos import thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await bus.start()
+    try:
+        await schedule_stale_analytics()
+    except Exception:
+        logger.exception("Не удалось проверить свежесть аналитики")
+    balance_queue.start(settings.BALANCE_WORKERS)
+    yield
+    # Задания балансировки лежат в БД — дожидаемся только текущих; пересчёты аналитики не теряем
+    await balance_queue.stop()
+    await analytics_scheduler.flush()
+    await bus.stop()
+    await websockets_manager.shutdown()
+    await thumbnails.shutdown()
+
 
-app = FastAPI()
+# Остальные dict-ответы тоже кодируются orjson
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 origins = [
     "http://localhost:5173",
@@ -22,6 +59,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SQLTimingMiddleware, instrumentation=sql_instrumentation)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/", include_in_schema=False)
@@ -34,8 +73,12 @@ async def websocket_endpoint(websocket: WebSocket):
     await websockets_manager.connect(websocket)
     try:
         while True:
-            data = await websocket.receive_text()
-    except WebSocketDisconnect:
+            await websocket.receive_text()
+            websockets_manager.touch(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError — сокет уже закрыт хабом (медленный клиент или нет ответа на ping)
+        pass
+    finally:
         websockets_manager.disconnect(websocket)
 
 
@@ -43,3 +86,10 @@ app.include_router(students_route)
 app.include_router(instructors_route)
 app.include_router(departments_route)
 app.include_router(groups_route)
+app.include_router(search_route)
+app.include_router(balancer_route)
+app.include_router(cache_route)
+app.include_router(gradebook_route)
+app.include_router(analytics_route)
+app.include_router(debug_route)
+app.include_router(metrics_route)
@@ -12,12 +12,15 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from server.src.database import DATABASE_URL_ASYNC, Base
 from server.src.models.department import Department
+from server.src.models.department_stats import DepartmentStats
 from server.src.models.group import Group
 from server.src.models.student import Student
 from server.src.models.instructor import Instructor
 from server.src.models.subject import Subject
 from server.src.models.group_subject import GroupSubjectTable
 from server.src.models.student_subject import StudentSubject
+from server.src.models.balance_diff import BalanceDiff
+from server.src.models.mark_stats import AnalyticsState, MarkStats, StudentMarkStats
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,103 @@
+"""department stats
+
+Revision ID: 1797d11bd2e2
+Revises: 536983665c14
+Create Date: 2026-10-18 14:41:09.270114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1797d11bd2e2'
+down_revision: Union[str, Sequence[str], None] = '536983665c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED_TABLES = {'students': 'students', 'instructors': 'instructors', 'groups': 'groups'}  # таблица -> счётчик
+
+# Триггеры уровня оператора с transition tables: один UPDATE счётчика на кафедру за оператор,
+# а не на каждую строку — COPY-импорт и балансировка не превращаются в тысячи UPDATE
+APPLY_FUNCTION = """
+CREATE FUNCTION department_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'INSERT INTO department_stats AS s (department_id, %1$I)
+             SELECT department_id, count(*) FROM new_rows GROUP BY department_id
+             ON CONFLICT (department_id) DO UPDATE SET %1$I = s.%1$I + excluded.%1$I',
+            TG_ARGV[0]);
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format(
+            'UPDATE department_stats AS s SET %1$I = s.%1$I - d.n
+             FROM (SELECT department_id, count(*) AS n FROM old_rows GROUP BY department_id) AS d
+             WHERE s.department_id = d.department_id',
+            TG_ARGV[0]);
+    ELSE
+        -- UPDATE: меняется только при переводе на другую кафедру, остальные изменения дают нулевую разницу
+        EXECUTE format(
+            'INSERT INTO department_stats AS s (department_id, %1$I)
+             SELECT department_id, sum(delta) FROM (
+                 SELECT department_id, 1 AS delta FROM new_rows
+                 UNION ALL
+                 SELECT department_id, -1 FROM old_rows
+             ) AS d
+             GROUP BY department_id HAVING sum(delta) <> 0
+             ORDER BY department_id
+             ON CONFLICT (department_id) DO UPDATE SET %1$I = s.%1$I + excluded.%1$I',
+            TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('department_stats',
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('students', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('instructors', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('groups', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('department_id')
+    )
+    op.execute(APPLY_FUNCTION)
+    for table, counter in COUNTED_TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER {table}_department_stats_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION department_stats_apply('{counter}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_department_stats_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION department_stats_apply('{counter}')
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_department_stats_update AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION department_stats_apply('{counter}')
+        """)
+    # Начальные значения — строка есть у каждой кафедры, даже пустой
+    op.execute("""
+        INSERT INTO department_stats (department_id, students, instructors, groups)
+        SELECT d.id,
+               (SELECT count(*) FROM students WHERE department_id = d.id),
+               (SELECT count(*) FROM instructors WHERE department_id = d.id),
+               (SELECT count(*) FROM groups WHERE department_id = d.id)
+        FROM departments AS d
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in COUNTED_TABLES:
+        for operation in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER {table}_department_stats_{operation} ON {table}")
+    op.execute("DROP FUNCTION department_stats_apply()")
+    op.drop_table('department_stats')
@@ -0,0 +1,28 @@
+"""students group index
+
+Revision ID: 4a1a64132755
+Revises: 1797d11bd2e2
+Create Date: 2026-10-18 16:05:12.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a1a64132755'
+down_revision: Union[str, Sequence[str], None] = '1797d11bd2e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_students_group_id_last_name_id', 'students', ['group_id', 'last_name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_students_group_id_last_name_id', table_name='students')
@@ -0,0 +1,73 @@
+"""mark analytics
+
+Revision ID: 536983665c14
+Revises: c7bdabc13d23
+Create Date: 2026-10-18 14:02:37.551093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '536983665c14'
+down_revision: Union[str, Sequence[str], None] = 'c7bdabc13d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mark_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('marks_count', sa.Integer(), nullable=False),
+    sa.Column('marks_sum', sa.Integer(), nullable=False),
+    sa.Column('mark_1', sa.Integer(), nullable=False),
+    sa.Column('mark_2', sa.Integer(), nullable=False),
+    sa.Column('mark_3', sa.Integer(), nullable=False),
+    sa.Column('mark_4', sa.Integer(), nullable=False),
+    sa.Column('mark_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mark_stats_department_id', 'mark_stats', ['department_id'], unique=False)
+    op.create_index('ix_mark_stats_subject_id', 'mark_stats', ['subject_id'], unique=False)
+    op.create_table('student_mark_stats',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('marks_count', sa.Integer(), nullable=False),
+    sa.Column('average', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('student_id')
+    )
+    op.create_index('ix_student_mark_stats_average', 'student_mark_stats', ['average', 'student_id'], unique=False)
+    op.create_index('ix_student_mark_stats_department_id_average', 'student_mark_stats',
+                    ['department_id', 'average', 'student_id'], unique=False)
+    op.create_table('analytics_state',
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('department_id')
+    )
+    # Все кафедры помечаются устаревшими — сервер пересчитает их в фоне при старте
+    op.execute("INSERT INTO analytics_state (department_id, changed_at) SELECT id, now() FROM departments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analytics_state')
+    op.drop_index('ix_student_mark_stats_department_id_average', table_name='student_mark_stats')
+    op.drop_index('ix_student_mark_stats_average', table_name='student_mark_stats')
+    op.drop_table('student_mark_stats')
+    op.drop_index('ix_mark_stats_subject_id', table_name='mark_stats')
+    op.drop_index('ix_mark_stats_department_id', table_name='mark_stats')
+    op.drop_table('mark_stats')
@@ -0,0 +1,30 @@
+"""keyset pagination indexes
+
+Revision ID: 5ef97f402084
+Revises: d1b74c2b91ab
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ef97f402084'
+down_revision: Union[str, Sequence[str], None] = 'd1b74c2b91ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_students_last_name_id', 'students', ['last_name', 'id'], unique=False)
+    op.create_index('ix_instructors_last_name_id', 'instructors', ['last_name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_instructors_last_name_id', table_name='instructors')
+    op.drop_index('ix_students_last_name_id', table_name='students')
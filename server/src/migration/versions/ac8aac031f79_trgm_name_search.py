@@ -0,0 +1,40 @@
+"""trgm name search
+
+Revision ID: ac8aac031f79
+Revises: 5ef97f402084
+Create Date: 2026-10-18 11:02:17.604512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac8aac031f79'
+down_revision: Union[str, Sequence[str], None] = '5ef97f402084'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('students', 'instructors')
+COLUMNS = ('first_name', 'last_name')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        for column in COLUMNS:
+            op.create_index(f'ix_{table}_{column}_trgm', table, [column], unique=False,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+            op.create_index(f'ix_{table}_{column}_prefix', table, [sa.text(f'lower({column}) text_pattern_ops')],
+                            unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for column in COLUMNS:
+            op.drop_index(f'ix_{table}_{column}_prefix', table_name=table)
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
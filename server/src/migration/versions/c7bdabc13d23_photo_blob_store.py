@@ -0,0 +1,67 @@
+"""photo blob store
+
+Revision ID: c7bdabc13d23
+Revises: 702ceb8937f4
+Create Date: 2026-10-18 13:05:12.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from server.src.config import settings
+from server.src.storage.blobstore import LocalBlobStore
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7bdabc13d23'
+down_revision: Union[str, Sequence[str], None] = '702ceb8937f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('students', 'instructors')
+BATCH_SIZE = 100  # фото читаются пачками, чтобы не держать все bytea в памяти
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    store = LocalBlobStore(settings.PHOTO_STORE_DIR)
+    connection = op.get_bind()
+    for table in TABLES:
+        op.add_column(table, sa.Column('photo_key', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('photo_size', sa.Integer(), nullable=True))
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.text(f'SELECT id, photo FROM {table} WHERE photo IS NOT NULL AND id > :last_id '
+                        f'ORDER BY id LIMIT :limit'),
+                {'last_id': last_id, 'limit': BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                connection.execute(
+                    sa.text(f'UPDATE {table} SET photo_key = :key, photo_size = :size WHERE id = :id'),
+                    {'key': store.put_bytes(row.photo), 'size': len(row.photo), 'id': row.id},
+                )
+            last_id = rows[-1].id
+        op.drop_column(table, 'photo')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    store = LocalBlobStore(settings.PHOTO_STORE_DIR)
+    connection = op.get_bind()
+    for table in TABLES:
+        op.add_column(table, sa.Column('photo', sa.LargeBinary(), nullable=True))
+        rows = connection.execute(
+            sa.text(f'SELECT id, photo_key FROM {table} WHERE photo_key IS NOT NULL ORDER BY id')
+        ).all()
+        for row in rows:
+            connection.execute(
+                sa.text(f'UPDATE {table} SET photo = :photo WHERE id = :id'),
+                {'photo': store.read_bytes(row.photo_key), 'id': row.id},
+            )
+        op.drop_column(table, 'photo_size')
+        op.drop_column(table, 'photo_key')
@@ -0,0 +1,48 @@
+"""balance jobs
+
+Revision ID: e3b5f0c29a71
+Revises: 4a1a64132755
+Create Date: 2026-10-18 18:42:07.316524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5f0c29a71'
+down_revision: Union[str, Sequence[str], None] = '4a1a64132755'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('balance_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('run_after', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_balance_jobs_status_run_after', 'balance_jobs', ['status', 'run_after'], unique=False)
+    op.create_index(
+        'ux_balance_jobs_pending_department_id', 'balance_jobs', ['department_id'], unique=True,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    # Кафедры, балансировка которых могла потеряться вместе с in-memory планировщиком, — проверить один раз
+    op.execute("INSERT INTO balance_jobs (department_id) SELECT id FROM departments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_balance_jobs_pending_department_id', table_name='balance_jobs')
+    op.drop_index('ix_balance_jobs_status_run_after', table_name='balance_jobs')
+    op.drop_table('balance_jobs')
@@ -1,9 +1,16 @@
+from server.src.models.balance_diff import BalanceDiff
+from server.src.models.balance_job import BalanceJob
 from server.src.models.department import Department
+from server.src.models.department_stats import DepartmentStats
 from server.src.models.group import Group
 from server.src.models.group_subject import GroupSubjectTable
 from server.src.models.instructor import Instructor
+from server.src.models.mark_stats import AnalyticsState, MarkStats, StudentMarkStats
 from server.src.models.student import Student
 from server.src.models.student_subject import StudentSubject
 from server.src.models.subject import Subject
 
-__all__ = ["Department", "Group", "GroupSubjectTable", "Instructor", "Student", "StudentSubject", "Subject"]
+__all__ = [
+    "AnalyticsState", "BalanceDiff", "BalanceJob", "Department", "DepartmentStats", "Group", "GroupSubjectTable",
+    "Instructor", "MarkStats", "Student", "StudentMarkStats", "StudentSubject", "Subject",
+]
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.src.database import Base
+
+
+class BalanceDiff(Base):
+    """Результат одной балансировки кафедры: кто из какой группы в какую перешёл"""
+    __tablename__ = "balance_diffs"
+    __table_args__ = (
+        Index("ix_balance_diffs_department_id_id", "department_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id"))
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    # {"students": [{"id", "from", "to"}], "groups": [{"id", "from", "to"}], "created_groups": [], "deleted_groups": []}
+    diff: Mapped[dict] = mapped_column(JSONB)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.src.database import Base
+
+
+class BalanceJob(Base):
+    """Задание на балансировку кафедры в очереди воркеров.
+
+    pending — ждёт воркера (не больше одного на кафедру: повторные запросы сливаются в него),
+    running — взято воркером, failed — исчерпало попытки и оставлено для разбора. Выполненные удаляются.
+    """
+    __tablename__ = "balance_jobs"
+    __table_args__ = (
+        Index(
+            "ux_balance_jobs_pending_department_id", "department_id",
+            unique=True, postgresql_where=text("status = 'pending'"),
+        ),
+        Index("ix_balance_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"))
+    status: Mapped[str] = mapped_column(String(16), server_default="pending")
+    attempts: Mapped[int] = mapped_column(server_default="0")
+    run_after: Mapped[datetime] = mapped_column(server_default=text("now()"))  # окно слияния и пауза между попытками
+    created_at: Mapped[datetime] = mapped_column(server_default=text("now()"))
+    started_at: Mapped[datetime | None]
+    error: Mapped[str | None]
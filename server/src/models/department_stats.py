@@ -0,0 +1,15 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.src.database import Base
+
+
+class DepartmentStats(Base):
+    """Счётчики кафедры. Поддерживаются триггерами на students / instructors / groups в той же транзакции,
+    что и изменение, — поэтому верны при любом способе записи (ORM, COPY-импорт, балансировщик)"""
+    __tablename__ = "department_stats"
+
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True)
+    students: Mapped[int] = mapped_column(server_default="0")
+    instructors: Mapped[int] = mapped_column(server_default="0")
+    groups: Mapped[int] = mapped_column(server_default="0")
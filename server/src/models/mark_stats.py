@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.src.database import Base
+
+
+class MarkStats(Base):
+    """Предагрегированные оценки по (кафедра, группа, предмет). Пересчитываются целиком по кафедре"""
+    __tablename__ = "mark_stats"
+    __table_args__ = (
+        Index("ix_mark_stats_department_id", "department_id"),
+        Index("ix_mark_stats_subject_id", "subject_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"))
+    group_id: Mapped[int | None] = mapped_column(nullable=True)  # без FK: группы удаляет балансировщик
+    subject_id: Mapped[int] = mapped_column(ForeignKey("subjects.id", ondelete="CASCADE"))
+    marks_count: Mapped[int]
+    marks_sum: Mapped[int]
+    # Распределение: сколько оценок каждого значения
+    mark_1: Mapped[int]
+    mark_2: Mapped[int]
+    mark_3: Mapped[int]
+    mark_4: Mapped[int]
+    mark_5: Mapped[int]
+
+
+class StudentMarkStats(Base):
+    """Средний балл каждого студента — для рейтинга top-N без сортировки всей таблицы оценок"""
+    __tablename__ = "student_mark_stats"
+    __table_args__ = (
+        Index("ix_student_mark_stats_average", "average", "student_id"),
+        Index("ix_student_mark_stats_department_id_average", "department_id", "average", "student_id"),
+    )
+
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"))
+    group_id: Mapped[int | None] = mapped_column(nullable=True)
+    marks_count: Mapped[int]
+    average: Mapped[float]
+
+
+class AnalyticsState(Base):
+    """Свежесть агрегатов кафедры: changed_at — последнее изменение оценок или состава групп,
+    refreshed_at — начало последнего пересчёта. Агрегаты устарели, если changed_at > refreshed_at"""
+    __tablename__ = "analytics_state"
+
+    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True)
+    changed_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    refreshed_at: Mapped[datetime | None] = mapped_column(nullable=True)
@@ -1,18 +1,29 @@
 from datetime import date
 
-from sqlalchemy import Date, ForeignKey, LargeBinary, func
+from sqlalchemy import Date, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from server.src.database import Base
 
 
 class Student(Base):
+    __table_args__ = (
+        Index("ix_students_last_name_id", "last_name", "id"),  # ключ keyset-пагинации списка
+        Index("ix_students_group_id_last_name_id", "group_id", "last_name", "id"),  # состав группы по порядку
+        # ILIKE '%x%' в фильтрах fn/ln и в поиске
+        Index("ix_students_first_name_trgm", "first_name", postgresql_using="gin",
+              postgresql_ops={"first_name": "gin_trgm_ops"}),
+        Index("ix_students_last_name_trgm", "last_name", postgresql_using="gin",
+              postgresql_ops={"last_name": "gin_trgm_ops"}),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str]
     last_name: Mapped[str]
     birth_date: Mapped[date]
     enroll_date: Mapped[date] = mapped_column(Date, default=date.today(), server_default=func.current_date())
-    photo: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    photo_key: Mapped[str | None] = mapped_column(nullable=True)  # sha256 содержимого, ключ в хранилище фото
+    photo_size: Mapped[int | None] = mapped_column(nullable=True)
     photo_mime: Mapped[str | None] = mapped_column(nullable=True)  # тип файла фото
     group_id: Mapped[int] = mapped_column(ForeignKey("groups.id", ondelete="SET NULL"), nullable=True)
     department_id: Mapped[int] = mapped_column(ForeignKey("departments.id"))
@@ -24,3 +35,10 @@ class Student(Base):
         back_populates="student",
         cascade="all, delete-orphan"
     )
+
+
+# Префиксный поиск автодополнения: lower(name) LIKE 'x%'
+Index("ix_students_first_name_prefix", func.lower(Student.first_name).label("first_name_lower"),
+      postgresql_ops={"first_name_lower": "text_pattern_ops"})
+Index("ix_students_last_name_prefix", func.lower(Student.last_name).label("last_name_lower"),
+      postgresql_ops={"last_name_lower": "text_pattern_ops"})
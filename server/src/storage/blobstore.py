@@ -0,0 +1,117 @@
+"""Хранилище бинарных объектов (фото), адресуемых хешем содержимого"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class BlobStore(ABC):
+    """Интерфейс хранилища. Ключ объекта — sha256 содержимого, поэтому одинаковые файлы хранятся один раз"""
+
+    @abstractmethod
+    async def put(self, chunks: AsyncIterator[bytes], max_size: int) -> tuple[str, int]:
+        """Сохраняет поток чанков, возвращает (ключ, размер). Больше max_size байт — BlobTooLarge"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open(self, key: str, start: int = 0, end: int | None = None) -> AsyncIterator[bytes]:
+        """Чанки объекта в диапазоне [start, end)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Path | None:
+        """Путь на диске, если бэкенд локальный — тогда файл можно отдать через FileResponse"""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """Файлы лежат в root/<первые 2 символа>/<следующие 2>/<ключ>. Запись — во временный файл и атомарный rename"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or not all(char in "0123456789abcdef" for char in key):
+            raise ValueError("Некорректный ключ объекта")
+        return self.root / key[:2] / key[2:4] / key
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+    async def put(self, chunks: AsyncIterator[bytes], max_size: int) -> tuple[str, int]:
+        tmp_dir = self.root / "tmp"
+        await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise BlobTooLarge(f"Файл больше {max_size} байт")
+                    digest.update(chunk)
+                    await asyncio.to_thread(tmp_file.write, chunk)
+            key = digest.hexdigest()
+            await asyncio.to_thread(self._commit, tmp_name, self._path(key))
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        return key, size
+
+    def put_bytes(self, data: bytes) -> str:
+        """Синхронная запись готового содержимого — для миграций и скриптов вне event loop"""
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        return key
+
+    def read_bytes(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    @staticmethod
+    def _commit(tmp_name: str, path: Path):
+        if path.exists():
+            return  # такой файл уже есть — дубликат не храним
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_name, path)
+
+    async def open(self, key: str, start: int = 0, end: int | None = None) -> AsyncIterator[bytes]:
+        with await asyncio.to_thread(open, self._path(key), "rb") as blob:
+            await asyncio.to_thread(blob.seek, start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(blob.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).exists)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
@@ -0,0 +1,113 @@
+"""Загрузка и отдача фото студентов и инструкторов через хранилище бинарных объектов"""
+import logging
+
+from fastapi import HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.src.config import settings
+from server.src.dao.cache import etag_matches
+from server.src.models.instructor import Instructor
+from server.src.models.student import Student
+from server.src.storage.blobstore import CHUNK_SIZE, BlobStore, BlobTooLarge, LocalBlobStore
+from server.src.storage.thumbnails import (
+    ORIGINAL,
+    SNIFF_BYTES,
+    VARIANT_MIME,
+    VARIANT_SIZES,
+    ThumbnailService,
+    sniff_image_mime,
+)
+
+logger = logging.getLogger(__name__)
+
+photo_store: BlobStore = LocalBlobStore(settings.PHOTO_STORE_DIR)
+thumbnails = ThumbnailService(photo_store, settings.THUMBNAIL_CACHE_BYTES, settings.THUMBNAIL_WORKERS)
+
+# Браузер хранит фото, но перед показом сверяет ETag — после замены фото сразу видно новое
+PHOTO_CACHE_CONTROL = "private, no-cache"
+
+
+async def _upload_chunks(file: UploadFile):
+    while chunk := await file.read(CHUNK_SIZE):
+        yield chunk
+
+
+async def save_photo(session: AsyncSession, file: UploadFile) -> tuple[str, int, str]:
+    """Проверяет, что файл — картинка, копирует его в хранилище кусками и сразу готовит миниатюры.
+
+    Возвращает (ключ, размер, MIME-тип по содержимому).
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Фото больше {settings.PHOTO_MAX_BYTES // (1024 * 1024)} МБ"
+    )
+    not_image = HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Файл не является изображением JPEG, PNG, GIF или WebP"
+    )
+    if file.size is not None and file.size > settings.PHOTO_MAX_BYTES:
+        raise too_large
+    mime = sniff_image_mime(await file.read(SNIFF_BYTES))
+    if mime is None:
+        raise not_image
+    await file.seek(0)
+    try:
+        key, size = await photo_store.put(_upload_chunks(file), settings.PHOTO_MAX_BYTES)
+    except BlobTooLarge:
+        raise too_large
+
+    try:
+        await thumbnails.render(key)
+    except Exception:
+        # Сигнатура совпала, но картинка не декодируется — такой файл не сохраняем
+        await release_photo(session, key)
+        raise not_image
+    return key, size, mime
+
+
+async def release_photo(session: AsyncSession, key: str | None):
+    """Удаляет файл, если на него больше никто не ссылается: одинаковые фото хранятся одним файлом"""
+    if not key:
+        return
+    query = select(or_(
+        exists().where(Student.photo_key == key),
+        exists().where(Instructor.photo_key == key),
+    ))
+    if not (await session.execute(query)).scalar():
+        await photo_store.delete(key)
+        thumbnails.cache.discard(key)
+
+
+async def photo_response(
+        request: Request, key: str, mime: str | None, size: int | None, variant: str = ORIGINAL
+) -> Response:
+    """Отдаёт фото или его миниатюру с ETag (ключ уже является хешем содержимого),
+    304 на If-None-Match и поддержкой Range для оригинала"""
+    etag = f'"{key}"' if variant == ORIGINAL else f'"{key}-{variant}"'
+    headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if variant != ORIGINAL:
+        try:
+            data = await thumbnails.get(key, VARIANT_SIZES[variant])
+        except Exception:
+            # Фото, загруженное до появления миниатюр, может не декодироваться — отдаём как есть
+            logger.exception("Не удалось построить миниатюру %s для %s", variant, key)
+        else:
+            return Response(content=data, media_type=VARIANT_MIME, headers=headers)
+        headers["ETag"] = etag = f'"{key}"'
+
+    media_type = mime or "image/jpeg"
+    path = photo_store.local_path(key)
+    if path is not None:
+        if not path.exists():
+            raise HTTPException(status_code=404, detail="Фото не найдено")
+        # FileResponse сам отдаёт файл кусками и обрабатывает Range / If-Range
+        return FileResponse(path, media_type=media_type, headers=headers)
+    if size is not None:
+        headers["Content-Length"] = str(size)
+    return StreamingResponse(photo_store.open(key), media_type=media_type, headers=headers)
@@ -0,0 +1,162 @@
+"""Уменьшенные копии фото: генерация в пуле процессов и LRU-кеш вариантов в памяти"""
+import asyncio
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal
+
+from server.src.storage.blobstore import BlobStore
+
+ORIGINAL = "original"
+VARIANT_SIZES = {"64": 64, "256": 256}  # сторона квадрата, в который вписывается миниатюра
+PhotoSize = Literal["64", "256", "original"]
+VARIANT_MIME = "image/jpeg"
+JPEG_QUALITY = 85
+
+# Сигнатуры форматов, которые умеет показать браузер и открыть Pillow
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+SNIFF_BYTES = 16
+
+
+def sniff_image_mime(head: bytes) -> str | None:
+    """Тип картинки по первым байтам файла — заголовку Content-Type от клиента не доверяем"""
+    for signature, mime in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def render_variants(source: str | bytes, sizes: list[int]) -> dict[int, bytes]:
+    """Выполняется в дочернем процессе: декодирует фото один раз и кодирует каждую миниатюру в JPEG"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        variants = {}
+        for size in sorted(sizes, reverse=True):
+            # Каждая следующая миниатюра меньше — уменьшаем уже уменьшенную копию
+            image.thumbnail((size, size))
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            variants[size] = buffer.getvalue()
+    return variants
+
+
+class VariantCache:
+    """LRU по суммарному размеру: при переполнении вытесняются давно не запрошенные миниатюры"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[str, int]) -> bytes | None:
+        data = self._items.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: tuple[str, int], data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._items[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def discard(self, photo_key: str):
+        for size in VARIANT_SIZES.values():
+            data = self._items.pop((photo_key, size), None)
+            if data is not None:
+                self.size -= len(data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ThumbnailService:
+    """Пул процессов не даёт декодированию больших фото блокировать event loop.
+
+    Одновременные запросы одной и той же миниатюры ждут одну общую генерацию.
+    """
+
+    def __init__(self, store: BlobStore, cache_bytes: int, workers: int | None = None):
+        self.store = store
+        self.cache = VariantCache(cache_bytes)
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._rendering: dict[str, asyncio.Future] = {}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # К этому моменту у сервера уже есть потоки (to_thread, sync-движок) — fork такого процесса
+            # может унаследовать захваченную блокировку и повиснуть; spawn запускает чистый интерпретатор
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def _source(self, photo_key: str) -> str | bytes:
+        path = self.store.local_path(photo_key)
+        if path is not None:
+            return str(path)  # дочерний процесс читает файл сам — байты не гоняются через pickle
+        return b"".join([chunk async for chunk in self.store.open(photo_key)])
+
+    async def render(self, photo_key: str) -> dict[int, bytes]:
+        """Генерирует все миниатюры фото и кладёт их в кеш. Ошибка декодирования пробрасывается"""
+        future = self._rendering.get(photo_key)
+        if future is None:
+            future = asyncio.ensure_future(self._render(photo_key))
+            self._rendering[photo_key] = future
+            future.add_done_callback(lambda _: self._rendering.pop(photo_key, None))
+        return await asyncio.shield(future)
+
+    async def _render(self, photo_key: str) -> dict[int, bytes]:
+        source = await self._source(photo_key)
+        loop = asyncio.get_running_loop()
+        variants = await loop.run_in_executor(
+            self._executor(), render_variants, source, list(VARIANT_SIZES.values())
+        )
+        for size, data in variants.items():
+            self.cache.put((photo_key, size), data)
+        return variants
+
+    async def get(self, photo_key: str, size: int) -> bytes:
+        data = self.cache.get((photo_key, size))
+        if data is None:
+            data = (await self.render(photo_key))[size]
+        return data
+
+    async def shutdown(self):
+        """Дожидается текущих генераций в потоке, не блокируя event loop; очередь отменяется"""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, cancel_futures=True)
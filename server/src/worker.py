@@ -0,0 +1,37 @@
+"""Воркеры очереди балансировки отдельно от API.
+
+Сколько угодно таких процессов (и воркеров внутри API, BALANCE_WORKERS) разбирают одну очередь в Postgres.
+Для API тогда обычно ставят BALANCE_WORKERS=0.
+Запуск: python -m server.src.worker --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from server.src.config import settings
+from server.src.dao.services import analytics_scheduler, balance_queue
+
+logger = logging.getLogger(__name__)
+
+
+async def main(workers: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    balance_queue.start(workers)
+    logger.info("Запущено воркеров балансировки: %s", workers)
+    await stop.wait()
+    logger.info("Остановка: дожидаемся текущих балансировок")
+    await balance_queue.stop()
+    # Пересчёт аналитики после балансировки планируется в этом процессе
+    await analytics_scheduler.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=max(settings.BALANCE_WORKERS, 1))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(args.workers))
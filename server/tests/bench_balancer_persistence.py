@@ -0,0 +1,93 @@
+"""Бенчмарк сохранения результата балансировки: UPDATE на каждую строку через ORM против одного UPDATE ... FROM unnest.
+
+Для каждого размера создаётся синтетическая кафедра со студентами, перемешанными по группам. Оба варианта
+стартуют из одного состояния (SAVEPOINT), в конце всё откатывается — база не меняется.
+Запуск: python -m server.tests.bench_balancer_persistence --sizes 500 5000 50000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+
+from server.src.api.groups.dao import GroupDAO
+from server.src.api.instructors.dao import InstructorDAO
+from server.src.api.students.dao import StudentDAO
+from server.src.dao.services import balancer
+from server.src.database import async_engine, async_session_maker
+
+SEED_SQL = [
+    text("INSERT INTO departments (name) VALUES (:name) RETURNING id"),
+    text("""
+        INSERT INTO instructors (first_name, last_name, birth_date, department_id)
+        SELECT 'Имя' || n, 'Фамилия' || n, DATE '1980-01-01', :department_id
+        FROM generate_series(1, :instructors) AS n
+    """),
+    text("""
+        INSERT INTO groups (department_id)
+        SELECT :department_id FROM generate_series(1, :groups)
+    """),
+    text("""
+        INSERT INTO students (first_name, last_name, birth_date, department_id, group_id)
+        SELECT 'Имя' || n, 'Фамилия' || n, DATE '2000-01-01', :department_id,
+               (SELECT min(id) FROM groups WHERE department_id = :department_id) + (n * 7919) % :groups
+        FROM generate_series(1, :size) AS n
+    """),
+]
+
+
+async def orm_per_row(session, department_id: int):
+    """Прежний способ: полные сущности, присваивание атрибутов, flush с UPDATE на каждую изменённую строку"""
+    instructors = await InstructorDAO.find_all_in_dep(session, department_id)
+    students = await StudentDAO.find_all_in_dep(session, department_id)
+    groups = await GroupDAO.find_all_in_dep(session, department_id)
+    _, mean_student_num_in_group, mean_group_num_per_instructor = balancer._get_group_distribution(
+        len(instructors), len(students))
+    for i, student in enumerate(students):
+        student.group_id = groups[i // mean_student_num_in_group].id
+    for i, group in enumerate(groups):
+        group.instructor_id = instructors[i // mean_group_num_per_instructor].id
+    await session.flush()
+
+
+async def set_based(session, department_id: int):
+    await balancer.balance(session, department_id)
+
+
+async def timed(connection, func, department_id: int) -> float:
+    savepoint = await connection.begin_nested()
+    async with async_session_maker(bind=connection) as session:
+        start = time.perf_counter()
+        await func(session, department_id)
+        elapsed = time.perf_counter() - start
+    await savepoint.rollback()
+    return elapsed
+
+
+async def run(sizes: list[int]):
+    print(f"{'students':>10} | {'per-row, s':>10} | {'set-based, s':>12} | speedup")
+    for size in sizes:
+        async with async_engine.connect() as connection:
+            transaction = await connection.begin()
+            department_id = (await connection.execute(SEED_SQL[0], {"name": f"bench-{uuid.uuid4()}"})).scalar_one()
+            params = {
+                "department_id": department_id,
+                "size": size,
+                "groups": -(-size // 10),
+                "instructors": max(1, size // 50),
+            }
+            for stmt in SEED_SQL[1:]:
+                await connection.execute(stmt, params)
+
+            before = await timed(connection, orm_per_row, department_id)
+            after = await timed(connection, set_based, department_id)
+            await transaction.rollback()
+        print(f"{size:>10} | {before:>10.3f} | {after:>12.3f} | x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5_000, 50_000])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
@@ -0,0 +1,95 @@
+"""Микробенчмарк списка студентов: ORM-путь (find_all + joinedload) против Core-проекции (find_page).
+
+Синтетические студенты вставляются внутри транзакции, которая в конце откатывается, — база не меняется.
+Запуск: python -m server.tests.bench_list_read_path --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from server.src.api.students.dao import StudentDAO
+from server.src.api.students.schema import SDepartmentOut, SStudentsOut
+from server.src.database import async_engine, async_session_maker
+from server.src.models.department import Department
+
+SEED_SQL = text("""
+    INSERT INTO students (first_name, last_name, birth_date, department_id, photo_key, photo_size, photo_mime)
+    SELECT 'Имя' || n, 'Фамилия' || (n % 5000), DATE '2000-01-01', :department_id,
+           CASE WHEN n % :photo_every = 0 THEN encode(sha256(n::text::bytea), 'hex') END,
+           CASE WHEN n % :photo_every = 0 THEN :photo_bytes END,
+           CASE WHEN n % :photo_every = 0 THEN 'image/jpeg' END
+    FROM generate_series(1, :size) AS n
+""")
+
+
+async def orm_path(session):
+    """Текущий путь: полные сущности, joinedload group/department, сборка SStudentsOut"""
+    students = await StudentDAO.find_all(session, {})
+    return [
+        SStudentsOut(
+            id=student.id,
+            first_name=student.first_name,
+            last_name=student.last_name,
+            department=SDepartmentOut(id=student.department_id, name=student.department.name),
+            group=student.group_id
+        )
+        for student in students
+    ]
+
+
+async def core_path(session, size: int):
+    """Новый путь: Core-проекция нужных колонок, строки сразу в dict"""
+    rows, _ = await StudentDAO.find_page(session, {}, limit=size)
+    return [
+        {
+            "id": row.id,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "department": {"id": row.department_id, "name": row.department_name},
+            "group": row.group_id,
+        }
+        for row in rows
+    ]
+
+
+async def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(sizes: list[int], repeat: int, photo_every: int, photo_bytes: int):
+    print(f"{'students':>10} | {'orm, s':>8} | {'core, s':>8} | speedup")
+    for size in sizes:
+        async with async_engine.connect() as connection:
+            transaction = await connection.begin()
+            async with async_session_maker(bind=connection) as session:
+                department_id = (await session.execute(select(Department.id).limit(1))).scalar_one()
+                await session.execute(SEED_SQL, {
+                    "department_id": department_id,
+                    "size": size,
+                    "photo_every": photo_every,
+                    "photo_bytes": photo_bytes,
+                })
+                await session.execute(text("ANALYZE students"))
+
+                orm_time = await measure(lambda: orm_path(session), repeat)
+                session.expunge_all()
+                core_time = await measure(lambda: core_path(session, size), repeat)
+            await transaction.rollback()
+        print(f"{size:>10} | {orm_time:>8.3f} | {core_time:>8.3f} | x{orm_time / core_time:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--photo-every", type=int, default=10, help="каждый N-й студент с фото")
+    parser.add_argument("--photo-bytes", type=int, default=50_000, help="размер фото в байтах")
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat, args.photo_every, args.photo_bytes))
@@ -0,0 +1,132 @@
+"""Микробенчмарк сериализации страницы списка: время на 10 000 строк по путям ответа.
+
+  models + response_model — как было: SStudentsOut собираются вручную, FastAPI валидирует страницу
+                            в response_model, выгружает в Python-объекты и кодирует json.dumps;
+  dict + response_model   — dict вместо моделей, остальное как у FastAPI по умолчанию;
+  dict + ORJSONResponse   — то же, но финальное кодирование orjson (default_response_class);
+  TypeAdapter             — одна валидация и dump_json в Rust (model_response);
+  json_response           — dict сразу в orjson, без валидации (путь списков сейчас).
+
+База не нужна — строки синтетические, поля и типы как у find_page.
+Запуск: python -m server.tests.bench_serialization --rows 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from server.src.api.students.schema import SDepartmentOut, SStudentsOut, SStudentsPage
+from server.src.dao.responses import json_response, type_adapter
+
+
+def make_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": n,
+            "first_name": f"Имя{n}",
+            "last_name": f"Фамилия{n % 5000}",
+            "department_id": n % 10 + 1,
+            "department_name": f"Кафедра {n % 10 + 1}",
+            "group_id": n // 10 or None,
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def page_dict(rows: list[dict]) -> dict:
+    return {
+        "items": [
+            {
+                "id": row["id"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "department": {"id": row["department_id"], "name": row["department_name"]},
+                "group": row["group_id"],
+            }
+            for row in rows
+        ],
+        "next_cursor": "eyJsYXN0X25hbWUiOiAi0KQifQ",
+        "total_estimate": None,
+    }
+
+
+def page_models(rows: list[dict]) -> dict:
+    return {
+        "items": [
+            SStudentsOut(
+                id=row["id"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                department=SDepartmentOut(id=row["department_id"], name=row["department_name"]),
+                group=row["group_id"],
+            )
+            for row in rows
+        ],
+        "next_cursor": "eyJsYXN0X25hbWUiOiAi0KQifQ",
+        "total_estimate": None,
+    }
+
+
+PAGE_FIELD = create_model_field("Response_get_students", SStudentsPage, mode="serialization")
+
+
+async def fastapi_path(payload, response_class) -> bytes:
+    content = await serialize_response(field=PAGE_FIELD, response_content=payload)
+    return response_class(content).body
+
+
+async def measure(build, repeat: int) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await build()
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+
+async def run(rows_count: int, repeat: int):
+    rows = make_rows(rows_count)
+    adapter = type_adapter(SStudentsPage)
+
+    async def adapter_path():
+        return adapter.dump_json(adapter.validate_python(page_dict(rows)))
+
+    async def models_path():
+        return await fastapi_path(page_models(rows), JSONResponse)
+
+    async def dict_path():
+        return await fastapi_path(page_dict(rows), JSONResponse)
+
+    async def orjson_path():
+        return await fastapi_path(page_dict(rows), ORJSONResponse)
+
+    async def direct_path():
+        return json_response(page_dict(rows)).body
+
+    paths = [
+        ("models + response_model", models_path),
+        ("dict + response_model", dict_path),
+        ("dict + ORJSONResponse", orjson_path),
+        ("TypeAdapter", adapter_path),
+        ("json_response", direct_path),
+    ]
+    baseline = None
+    print(f"{rows_count} rows, best of {repeat}")
+    print(f"{'path':<24} | {'ms':>8} | {'ms / 10k':>8} | {'bytes':>9} | speedup")
+    for name, build in paths:
+        seconds, size = await measure(build, repeat)
+        baseline = baseline or seconds
+        print(f"{name:<24} | {seconds * 1000:>8.2f} | {seconds * 1000 * 10_000 / rows_count:>8.2f} | "
+              f"{size:>9} | {baseline / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
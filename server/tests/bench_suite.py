@@ -0,0 +1,318 @@
+"""Нагрузочный прогон настоящего приложения асинхронными httpx-клиентами с JSON-отчётом для сравнения прогонов.
+
+Сценарии:
+  list     — страницы списка студентов и инструкторов (с фильтром по кафедре и переходом по курсору);
+  detail   — карточки студентов и инструкторов;
+  search   — автодополнение /search/people и фильтр по фамилии;
+  write    — зачисление, перевод и отчисление студента — каждое запускает балансировку;
+  refetch  — WebSocket-клиенты на каждое событие balance перечитывают список и справочники,
+             как это делают вкладки браузера; пишущий клиент порождает балансировки.
+
+Перед прогоном база заполняется seed_data (одинаковые --scale и --seed дают одинаковые данные),
+сервер запускается отдельно (или флагом --start-server).
+Запуск:
+  python -m server.tests.seed_data --scale 10 --seed 42 --reset
+  python -m server.tests.bench_suite --duration 30 --concurrency 50 --out bench.json
+  python -m server.tests.bench_suite --duration 30 --concurrency 50 --out new.json --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+SCENARIOS = ("list", "detail", "search", "write", "refetch")
+SEARCH_PREFIXES = ["Ив", "Сми", "Куз", "Пет", "Ал", "Мар", "Ник", "Ор", "Зай", "Гри"]
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+class Recorder:
+    """Латентности по операциям сценария; ошибкой считается исключение или ответ 5xx"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, operation: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[operation] += 1
+            return None
+        self.latencies[operation].append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            self.errors[operation] += 1
+        return response
+
+    def observe(self, operation: str, seconds: float):
+        self.latencies[operation].append(seconds)
+
+    def report(self, elapsed: float) -> dict:
+        result = {}
+        for operation in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies[operation]
+            result[operation] = {
+                "requests": len(values),
+                "errors": self.errors[operation],
+                "throughput_rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+                "p95_ms": round(percentile(values, 95) * 1000, 2) if values else None,
+                "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+                "max_ms": round(max(values) * 1000, 2) if values else None,
+            }
+        return result
+
+
+class Dataset:
+    """Id и кафедры, по которым ходят сценарии, — собираются с сервера перед прогоном"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.departments: list[int] = []
+        self.staffed: list[int] = []
+        self.students: list[int] = []
+        self.instructors: list[int] = []
+
+    async def load(self, client: httpx.AsyncClient, sample: int):
+        self.departments = [department["id"] for department in (await client.get("/departments/")).json()]
+        for department_id in self.departments:
+            stats = (await client.get(f"/departments/{department_id}/stats")).json()
+            if stats["instructors"]:
+                self.staffed.append(department_id)
+        self.students = await self._ids(client, "/students/", sample)
+        self.instructors = await self._ids(client, "/instructors/", sample)
+        if not self.students or not self.staffed:
+            raise SystemExit("База пуста — сначала заполните её: python -m server.tests.seed_data")
+
+    @staticmethod
+    async def _ids(client: httpx.AsyncClient, path: str, sample: int) -> list[int]:
+        ids, cursor = [], None
+        while len(ids) < sample:
+            params = {"limit": 1000, **({"after": cursor} if cursor else {})}
+            page = (await client.get(path, params=params)).json()
+            ids += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        return ids[:sample]
+
+
+async def list_worker(client, recorder: Recorder, data: Dataset, deadline: float):
+    rng = data.rng
+    while time.perf_counter() < deadline:
+        entity = rng.choice(["students", "instructors"])
+        params = {"limit": 50}
+        if rng.random() < 0.5:
+            params["d"] = rng.choice(data.departments)
+        for _ in range(rng.randint(1, 3)):
+            response = await recorder.call(f"{entity}_page", client.get(f"/{entity}/", params=params))
+            if response is None or response.status_code != 200 or not response.json()["next_cursor"]:
+                break
+            params["after"] = response.json()["next_cursor"]
+
+
+async def detail_worker(client, recorder: Recorder, data: Dataset, deadline: float):
+    rng = data.rng
+    while time.perf_counter() < deadline:
+        if rng.random() < 0.7:
+            await recorder.call("student_detail", client.get(f"/students/{rng.choice(data.students)}"))
+        else:
+            await recorder.call("instructor_detail", client.get(f"/instructors/{rng.choice(data.instructors)}"))
+
+
+async def search_worker(client, recorder: Recorder, data: Dataset, deadline: float):
+    rng = data.rng
+    while time.perf_counter() < deadline:
+        prefix = rng.choice(SEARCH_PREFIXES)
+        if rng.random() < 0.5:
+            await recorder.call("autocomplete", client.get("/search/people", params={"q": prefix}))
+        else:
+            params = {"ln": prefix.lower(), "limit": 50, "d": rng.choice(data.departments)}
+            await recorder.call("filter_last_name", client.get("/students/", params=params))
+
+
+async def write_worker(client, recorder: Recorder, data: Dataset, deadline: float):
+    rng = data.rng
+    while time.perf_counter() < deadline:
+        department_id, target_id = rng.choice(data.staffed), rng.choice(data.staffed)
+        student = {"last_name": "Нагрузочный", "first_name": "Тест", "birth_date": "2004-05-06",
+                   "department_id": department_id}
+        response = await recorder.call("student_add", client.post("/students/add", json=student))
+        if response is None or response.status_code != 200:
+            continue
+        student_id = response.json()["id"]
+        await recorder.call(
+            "student_transfer", client.put(f"/students/{student_id}/update", json={"department_id": target_id})
+        )
+        await recorder.call("student_delete", client.delete(f"/students/{student_id}/delete"))
+
+
+async def refetch_scenario(client, recorder: Recorder, data: Dataset, deadline: float, clients: int, ws_url: str):
+    """Каждый WebSocket-клиент на событие balance перечитывает список своей кафедры и справочники.
+
+    Кроме отдельных запросов записывается refetch_storm — от получения события первым клиентом до момента,
+    когда последний клиент закончил перечитывание.
+    """
+    import websockets  # зависимость сервера (uvicorn[standard]), нужна только этому сценарию
+
+    storms: dict[int, list[float]] = defaultdict(list)  # diff_id -> время окончания перечитывания клиентами
+    started: dict[int, float] = {}
+
+    async def browser(department_id: int):
+        async with websockets.connect(ws_url, max_queue=None) as websocket:
+            while time.perf_counter() < deadline:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), max(deadline - time.perf_counter(), 0.01))
+                except asyncio.TimeoutError:
+                    break
+                if message == "ping":
+                    await websocket.send("pong")
+                    continue
+                event = json.loads(message)
+                if event["type"] != "balance":
+                    continue
+                started.setdefault(event["diff_id"], time.perf_counter())
+                await asyncio.gather(
+                    recorder.call("refetch_list", client.get("/students/", params={"d": department_id, "limit": 100})),
+                    recorder.call("refetch_groups", client.get("/groups/")),
+                    recorder.call("refetch_departments", client.get("/departments/")),
+                )
+                storms[event["diff_id"]].append(time.perf_counter())
+
+    browsers = [asyncio.create_task(browser(data.rng.choice(data.departments))) for _ in range(clients)]
+    await asyncio.sleep(1.0)  # даём всем подключиться
+    await write_worker(client, recorder, data, deadline)
+    await asyncio.gather(*browsers, return_exceptions=True)
+    for diff_id, finished in storms.items():
+        recorder.observe("refetch_storm", max(finished) - started[diff_id])
+
+
+async def run_scenario(name: str, args, data: Dataset) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency + args.ws_clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        deadline = time.perf_counter() + args.duration
+        start = time.perf_counter()
+        if name == "refetch":
+            ws_url = args.base_url.replace("http", "ws", 1) + "/ws"
+            await refetch_scenario(client, recorder, data, deadline, args.ws_clients, ws_url)
+        else:
+            worker = {"list": list_worker, "detail": detail_worker, "search": search_worker,
+                      "write": write_worker}[name]
+            await asyncio.gather(*(worker(client, recorder, data, deadline) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return recorder.report(elapsed)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict):
+    """Изменение p95 и пропускной способности относительно прошлого прогона"""
+    print(f"{'operation':<28} | {'p95, ms':>17} | {'rps':>17}")
+    for scenario, operations in report["results"].items():
+        for operation, stats in operations.items():
+            old = baseline.get("results", {}).get(scenario, {}).get(operation)
+            if not old or not old["p95_ms"] or not stats["p95_ms"]:
+                continue
+            p95_change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            rps_change = (stats["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100 \
+                if old["throughput_rps"] else 0.0
+            print(f"{scenario + '/' + operation:<28} | {old['p95_ms']:>7} → {stats['p95_ms']:<7} {p95_change:+.0f}% "
+                  f"| {old['throughput_rps']:>7} → {stats['throughput_rps']:<7} {rps_change:+.0f}%")
+
+
+async def wait_for_server(base_url: str, timeout: float = 30.0):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                if (await client.get("/departments/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise SystemExit(f"Сервер {base_url} не отвечает")
+            await asyncio.sleep(0.5)
+
+
+async def main(args):
+    server = None
+    if args.start_server:
+        port = httpx.URL(args.base_url).port or 8000
+        server = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "server.src.main:app", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ])
+    try:
+        await wait_for_server(args.base_url)
+        data = Dataset(random.Random(args.seed))
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60.0) as client:
+            await data.load(client, args.sample)
+        results = {}
+        for name in args.scenarios:
+            print(f"→ {name} ({args.duration}s)")
+            results[name] = await run_scenario(name, args, data)
+            for operation, stats in results[name].items():
+                print(f"  {operation:<22} {stats['requests']:>7} req  {stats['throughput_rps']:>8} rps  "
+                      f"p50 {stats['p50_ms']}  p95 {stats['p95_ms']}  p99 {stats['p99_ms']} ms  "
+                      f"errors {stats['errors']}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "base_url": args.base_url,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "ws_clients": args.ws_clients,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=20.0, help="секунд на сценарий")
+    parser.add_argument("--concurrency", type=int, default=50, help="параллельных клиентов в сценарии")
+    parser.add_argument("--ws-clients", type=int, default=200, help="WebSocket-клиентов в сценарии refetch")
+    parser.add_argument("--seed", type=int, default=42, help="зерно выбора id и кафедр")
+    parser.add_argument("--sample", type=int, default=5000, help="сколько id студентов и инструкторов выбирать")
+    parser.add_argument("--out", help="куда записать JSON-отчёт")
+    parser.add_argument("--compare", help="JSON-отчёт прошлого прогона для сравнения")
+    parser.add_argument("--start-server", action="store_true", help="запустить uvicorn на порту из --base-url")
+    parser.add_argument("--workers", type=int, default=1, help="воркеров uvicorn для --start-server")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""Проверка single-flight для GET-списков без базы: загрузка подменяется медленной функцией со счётчиком.
+
+1. Одновременные одинаковые запросы (с разным порядком параметров) выполняют одну загрузку.
+2. После окончания загрузки в окне reuse_window отдаётся готовый ответ.
+3. Запрос после invalidate (событие об изменениях) не присоединяется к загрузке, начатой до события,
+   — иначе клиент, перечитавший список по balance, получил бы снимок до балансировки.
+Запуск: python -m server.tests.check_coalescing
+"""
+import asyncio
+
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from server.src.dao import coalescing
+from server.src.dao.responses import json_response
+
+
+class NoSession:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_app(coalescer: coalescing.RequestCoalescer) -> tuple[FastAPI, dict]:
+    app = FastAPI()
+    state = {"version": 1, "loads": 0}
+
+    @app.get("/items")
+    async def items(request: Request):
+        async def load(session):
+            state["loads"] += 1
+            version = state["version"]  # снимок данных на момент начала загрузки
+            await asyncio.sleep(0.2)
+            return json_response({"version": version})
+        return await coalescer.respond(request, load)
+
+    return app, state
+
+
+async def run():
+    coalescing.async_session_maker = NoSession  # сессия загрузке-подмене не нужна
+    coalescer = coalescing.RequestCoalescer(reuse_window=0.5)
+    app, state = make_app(coalescer)
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        # 1. Одна загрузка на пачку одинаковых запросов
+        responses = await asyncio.gather(*(
+            client.get("/items?a=1&b=2" if n % 2 else "/items?b=2&a=1") for n in range(20)
+        ))
+        assert state["loads"] == 1, state
+        assert {response.headers["x-coalesced"] for response in responses} == {"leader", "joined"}
+        print("concurrent: 20 requests, 1 load")
+
+        # 2. Повтор в окне reuse_window
+        response = await client.get("/items?a=1&b=2")
+        assert response.headers["x-coalesced"] == "reused" and state["loads"] == 1
+        print("reuse window: reused")
+
+        # 3. Событие во время загрузки: новый запрос начинает свою
+        coalescer.invalidate()
+        before = asyncio.create_task(client.get("/items?a=1&b=2"))
+        await asyncio.sleep(0.05)
+        state["version"] = 2  # изменение закоммичено, событие пришло
+        coalescer.invalidate()
+        after = await client.get("/items?a=1&b=2")
+        assert after.headers["x-coalesced"] == "leader", after.headers
+        assert after.json() == {"version": 2}, after.json()
+        assert (await before).json() == {"version": 1}
+        print("invalidate in flight: fresh load after the event")
+    print(coalescer.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,88 @@
+"""Проверка шины LISTEN/NOTIFY на локальном Postgres: задержка доставки между "воркерами" и переподключение.
+
+Две шины в одном процессе изображают два воркера. Воркер A публикует, воркер B получает; затем
+LISTEN-соединение B принудительно обрывается через pg_terminate_backend, и проверяется, что B
+переподключился, разослал resync и снова получает события. Большое событие уходит через fallback-ссылку.
+Запуск: python -m server.tests.check_notification_bus --messages 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+
+from server.src.config import get_asyncpg_dsn
+from server.src.dao.bus import RESYNC_MESSAGE, NotificationBus
+from server.src.database import async_engine
+
+
+class Inbox:
+    def __init__(self):
+        self.messages: list[str] = []
+        self.latencies: list[float] = []
+        self.changed = asyncio.Event()
+
+    def deliver(self, message: str):
+        self.messages.append(message)
+        data = json.loads(message)
+        if "sent_at" in data:
+            self.latencies.append(time.perf_counter() - data["sent_at"])
+        self.changed.set()
+
+    async def wait_for(self, predicate, timeout: float = 10.0):
+        async def wait():
+            while not predicate():
+                self.changed.clear()
+                await self.changed.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+
+async def resolve(reference: dict) -> str:
+    return json.dumps({"resolved": reference, "body": "x" * 10_000})
+
+
+async def run(messages: int):
+    inbox_a, inbox_b = Inbox(), Inbox()
+    bus_a = NotificationBus(get_asyncpg_dsn(), inbox_a.deliver, resolve, reconnect_delay=0.2)
+    bus_b = NotificationBus(get_asyncpg_dsn(), inbox_b.deliver, resolve, reconnect_delay=0.2, health_interval=1.0)
+    await bus_a.start()
+    await bus_b.start()
+    await asyncio.wait_for(asyncio.gather(bus_a.connected.wait(), bus_b.connected.wait()), 10)
+
+    # 1. Задержка доставки A -> B
+    for i in range(messages):
+        await bus_a.publish(json.dumps({"n": i, "sent_at": time.perf_counter()}))
+    await inbox_b.wait_for(lambda: len(inbox_b.latencies) >= messages)
+    latencies = sorted(inbox_b.latencies)
+    print(f"delivered {messages}: p50={statistics.median(latencies) * 1000:.2f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}ms max={latencies[-1] * 1000:.2f}ms")
+
+    # 2. Событие больше лимита NOTIFY уходит ссылкой и восстанавливается на стороне получателя
+    await bus_a.publish(json.dumps({"body": "y" * 10_000}), fallback=json.dumps({"ref": "big", "id": 1}))
+    await inbox_b.wait_for(lambda: any('"resolved"' in message for message in inbox_b.messages))
+    print("oversized event resolved via fallback reference")
+
+    # 3. Обрыв LISTEN-соединения B и переподключение
+    pid = bus_b._connection.get_server_pid()
+    start = time.perf_counter()
+    async with async_engine.begin() as connection:
+        await connection.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+    await inbox_b.wait_for(lambda: RESYNC_MESSAGE in inbox_b.messages)
+    print(f"reconnected in {(time.perf_counter() - start) * 1000:.0f}ms, reconnects={bus_b.reconnects}")
+    received = len(inbox_b.latencies)
+    await bus_a.publish(json.dumps({"n": "after-reconnect", "sent_at": time.perf_counter()}))
+    await inbox_b.wait_for(lambda: len(inbox_b.latencies) > received)
+    print("delivery after reconnect: ok")
+
+    await bus_a.stop()
+    await bus_b.stop()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages))
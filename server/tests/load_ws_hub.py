@@ -0,0 +1,104 @@
+"""Нагрузочный тест WebSocket-хаба на тысячах симулированных клиентов (без сети и без сервера).
+
+Среди клиентов есть быстрые, зависшие (send_text никогда не завершается) и мёртвые (send_text падает).
+Проверяется, что рассылка быстрым клиентам не тормозит из-за остальных, а зависшие и мёртвые отключаются.
+Половина сообщений уходит одной пачкой больше queue_size: быстрые клиенты при этом не должны отключаться.
+Запуск: python -m server.tests.load_ws_hub --clients 5000 --messages 50
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from server.src.dao.hub import WebSocketHub
+
+
+class FakeWebSocket:
+    def __init__(self, mode: str):
+        self.mode = mode  # "fast" | "stalled" | "dead"
+        self.latencies: list[float] = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.mode == "stalled":
+            await asyncio.Event().wait()
+        if self.mode == "dead":
+            raise ConnectionResetError
+        if message != "ping":
+            self.latencies.append(time.perf_counter() - float(message))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def run(clients: int, messages: int, stalled_share: float, dead_share: float, timeout: float):
+    # Жёсткий предел очереди не меньше пачки: проверяем политику переполнения, а не нехватку памяти
+    hub = WebSocketHub(queue_size=16, send_timeout=1.0, max_queue_size=max(160, messages))
+    sockets = []
+    for i in range(clients):
+        if i < clients * stalled_share:
+            mode = "stalled"
+        elif i < clients * (stalled_share + dead_share):
+            mode = "dead"
+        else:
+            mode = "fast"
+        websocket = FakeWebSocket(mode)
+        await hub.connect(websocket)
+        sockets.append(websocket)
+
+    # Половину сообщений публикуем из другого потока — как балансировщик из воркера
+    loop_thread_messages = messages // 2
+    start = time.perf_counter()
+    for _ in range(loop_thread_messages):
+        hub.publish(repr(time.perf_counter()))
+        await asyncio.sleep(0)
+    publisher = threading.Thread(
+        target=lambda: [hub.publish(repr(time.perf_counter())) for _ in range(messages - loop_thread_messages)]
+    )
+    publisher.start()
+    await asyncio.to_thread(publisher.join)
+
+    fast = [websocket for websocket in sockets if websocket.mode == "fast"]
+
+    async def delivered():
+        while any(len(websocket.latencies) < messages for websocket in fast):
+            assert not any(websocket.closed for websocket in fast), f"быстрый клиент отключён: {hub.stats()}"
+            await asyncio.sleep(0.01)
+
+    try:
+        await asyncio.wait_for(delivered(), timeout)
+    except asyncio.TimeoutError:
+        raise AssertionError(f"за {timeout}s доставлено не всё: {hub.stats()}") from None
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(hub.send_timeout + 0.1)  # даём зависшим клиентам упереться в send_timeout
+
+    latencies = [latency for websocket in fast for latency in websocket.latencies]
+    slow = [websocket for websocket in sockets if websocket.mode != "fast"]
+    print(f"clients: {clients} (fast {len(fast)}, stalled/dead {len(slow)}), messages: {messages}")
+    print(f"delivered: {len(latencies)} in {elapsed:.3f}s, {len(latencies) / elapsed:,.0f} msg/s")
+    print(f"latency p50={percentile(latencies, 50) * 1000:.2f}ms p99={percentile(latencies, 99) * 1000:.2f}ms")
+    print(f"evicted: {hub.evicted}, all stalled/dead closed: {all(websocket.closed for websocket in slow)}")
+    print(f"hub: {hub.stats()}")
+    assert not any(websocket.closed for websocket in fast), "отключены быстрые клиенты"
+    assert all(websocket.closed for websocket in slow), "не отключены зависшие или мёртвые клиенты"
+    assert hub.evicted == len(slow), f"отключено {hub.evicted}, ожидалось {len(slow)}"
+    await hub.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--stalled", type=float, default=0.01, help="доля зависших клиентов")
+    parser.add_argument("--dead", type=float, default=0.01, help="доля мёртвых клиентов")
+    parser.add_argument("--timeout", type=float, default=60.0, help="предел ожидания доставки, секунд")
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.messages, args.stalled, args.dead, args.timeout))
@@ -0,0 +1,156 @@
+"""Генератор синтетических данных для нагрузочных тестов: инструкторы, группы, студенты и оценки через COPY.
+
+Объём задаётся масштабом (--scale 1 — 10 000 студентов и 500 инструкторов), состав — зерном (--seed):
+одинаковые параметры на пустой базе дают одинаковые данные. Группы строятся так же, как их строит
+балансировщик, поэтому после заливки кафедры уже сбалансированы и не дают фоновой работы на старте.
+Кафедры и предметы создаются db_init_filling, если их ещё нет.
+Запуск: python -m server.tests.seed_data --scale 10 --seed 42 --reset
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from itertools import cycle
+
+from sqlalchemy import select, text
+
+from server.src.api.analytics.dao import AnalyticsDAO
+from server.src.dao.services import Balancer
+from server.src.database import async_session_maker
+from server.src.models.department import Department
+from server.src.models.subject import Subject
+from server.tests.db_init_filling import create_test_data
+
+STUDENTS_PER_SCALE = 10_000
+INSTRUCTORS_PER_SCALE = 500
+MARKED_SHARE = 0.8  # доля выставленных оценок, остальные — NULL
+BIRTH_DATES_FROM = date(2025, 9, 1)  # не date.today(): данные не должны зависеть от дня запуска
+
+FIRST_NAMES = [
+    "Александр", "Алексей", "Анна", "Анастасия", "Андрей", "Валерия", "Виктор", "Дарья", "Дмитрий", "Екатерина",
+    "Елена", "Иван", "Ирина", "Кирилл", "Ксения", "Максим", "Мария", "Михаил", "Наталья", "Никита",
+    "Ольга", "Павел", "Полина", "Роман", "Светлана", "Сергей", "София", "Татьяна", "Юлия", "Ярослав",
+]
+LAST_NAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков", "Фёдоров",
+    "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров", "Павлов", "Козлов", "Степанов", "Николаев",
+    "Орлов", "Андреев", "Макаров", "Никитин", "Захаров", "Зайцев", "Соловьёв", "Борисов", "Яковлев", "Григорьев",
+]
+
+RESET_SQL = [
+    # RESTART IDENTITY — чтобы при том же зерне совпадали и id
+    "TRUNCATE student_subject_table, students, groups, instructors, balance_diffs, balance_jobs, "
+    "student_mark_stats, mark_stats, analytics_state RESTART IDENTITY",
+    # TRUNCATE не вызывает триггеры счётчиков
+    "UPDATE department_stats SET students = 0, instructors = 0, groups = 0",
+]
+
+
+def _split(total: int, parts: int, rng: random.Random) -> list[int]:
+    """Неравномерное разбиение total на parts частей: кафедры в реальности разного размера"""
+    weights = [rng.uniform(0.3, 1.7) for _ in range(parts)]
+    scale = total / sum(weights)
+    sizes = [int(weight * scale) for weight in weights]
+    sizes[0] += total - sum(sizes)
+    return sizes
+
+
+def _person(rng: random.Random, oldest: int, youngest: int) -> tuple[str, str, date]:
+    birth_date = BIRTH_DATES_FROM - timedelta(days=rng.randint(youngest * 365, oldest * 365))
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), birth_date
+
+
+async def _reserve_ids(session, table: str, count: int) -> list[int]:
+    """Id из последовательности таблицы заранее — чтобы сразу связать строки в COPY"""
+    if not count:
+        return []
+    result = await session.execute(
+        text(f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) FROM generate_series(1, :count)"),
+        {"count": count},
+    )
+    return list(result.scalars().all())
+
+
+async def _copy(session, table: str, columns: list[str], records: list[tuple]) -> None:
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def _seed_department(session, rng: random.Random, department_id: int, subject_ids: list[int],
+                           students_num: int, instructors_num: int) -> dict:
+    """Одна кафедра — одна порция COPY: память ограничена самой большой кафедрой, а не всей базой"""
+    instructor_ids = await _reserve_ids(session, "instructors", instructors_num)
+    instructors = [(id_, *_person(rng, 65, 28), department_id) for id_ in instructor_ids]
+
+    group_num, _, _ = Balancer()._get_group_distribution(instructors_num, students_num)
+    group_ids = await _reserve_ids(session, "groups", group_num)
+    groups = [(group_id, instructor_id, department_id)
+              for group_id, instructor_id in zip(group_ids, cycle(instructor_ids))]
+
+    student_ids = await _reserve_ids(session, "students", students_num)
+    students, marks = [], []
+    for student_id, group_id in zip(student_ids, cycle(group_ids or [None])):
+        students.append((student_id, *_person(rng, 25, 17), group_id, department_id))
+        marks += [
+            (student_id, subject_id, rng.randint(2, 5) if rng.random() < MARKED_SHARE else None)
+            for subject_id in subject_ids
+        ]
+
+    # Порядок — по внешним ключам; триггеры счётчиков кафедр срабатывают и на COPY
+    await _copy(session, "instructors", ["id", "first_name", "last_name", "birth_date", "department_id"], instructors)
+    await _copy(session, "groups", ["id", "instructor_id", "department_id"], groups)
+    await _copy(session, "students", ["id", "first_name", "last_name", "birth_date", "group_id", "department_id"],
+                students)
+    await _copy(session, "student_subject_table", ["student_id", "subject_id", "mark"], marks)
+    return {"instructors": len(instructors), "groups": len(groups), "students": len(students), "marks": len(marks)}
+
+
+async def seed(scale: float, seed_value: int, reset: bool) -> Counter:
+    await create_test_data()
+    rng = random.Random(seed_value)
+    counts = Counter()
+    async with async_session_maker() as session:
+        async with session.begin():
+            if reset:
+                for statement in RESET_SQL:
+                    await session.execute(text(statement))
+            department_ids = list((await session.execute(select(Department.id).order_by(Department.id))).scalars())
+            subjects: dict[int, list[int]] = {department_id: [] for department_id in department_ids}
+            for subject_id, department_id in await session.execute(
+                    select(Subject.id, Subject.department_id).order_by(Subject.id)):
+                subjects[department_id].append(subject_id)
+
+            student_sizes = _split(int(STUDENTS_PER_SCALE * scale), len(department_ids), rng)
+            instructor_sizes = _split(int(INSTRUCTORS_PER_SCALE * scale), len(department_ids), rng)
+            for department_id, students_num, instructors_num in zip(department_ids, student_sizes, instructor_sizes):
+                counts.update(await _seed_department(
+                    session, rng, department_id, subjects[department_id], students_num, max(1, instructors_num)
+                ))
+            await AnalyticsDAO.touch_departments(session, set(department_ids))
+
+        for department_id in department_ids:
+            async with session.begin():
+                await AnalyticsDAO.refresh_department(session, department_id)
+        async with session.begin():
+            for table in ("instructors", "groups", "students", "student_subject_table", "department_stats"):
+                await session.execute(text(f"ANALYZE {table}"))
+    return counts
+
+
+async def main(scale: float, seed_value: int, reset: bool):
+    start = time.perf_counter()
+    counts = await seed(scale, seed_value, reset)
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()),
+          f"за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = 10 000 студентов и 500 инструкторов")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="удалить существующих людей, группы и оценки")
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.seed, args.reset))